@@ -0,0 +1,131 @@
+'''t_main.py 단계별 성능 측정 (합성 데이터 벤치마크)
+
+train.csv/test.csv와 같은 형식의 합성 데이터를 원하는 행 수만큼 만들고,
+t_main.py의 각 단계를 따로 실행하면서 실행 시간(wall/CPU)과 최대 메모리를 잰다.
+결과는 JSON 파일로 저장하고, 이전 결과 파일과 비교할 수 있다.
+
+사용 예:
+    python bench.py --sizes 10k 1m
+    python bench.py --sizes 10k --compare bench_results/t_main_20260101_120000.json
+'''
+import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')  # 화면 없이 그래프를 그림 (plt.show()가 멈추지 않도록)
+
+import numpy as np
+import pandas as pd
+
+# 4-1, 4-2가 함께 쓰는 모듈(common 폴더)을 import할 수 있도록 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
+
+import t_main
+from bench_common import measure, run_benchmark
+
+
+DATA_DIR = 'bench_data'
+
+PLANETS = ['Earth', 'Europa', 'Mars']
+DESTINATIONS = ['TRAPPIST-1e', '55 Cancri e', 'PSO J318.5-22']
+DECKS = list('ABCDEFGT')
+FIRST_NAMES = ['Maham', 'Juanna', 'Altark', 'Solam', 'Willy', 'Sandie', 'Billex', 'Candra', 'Andona', 'Erraiam']
+LAST_NAMES = ['Ofracculy', 'Vines', 'Susent', 'Santantines', 'Hinetthews', 'Jacostaffey', 'Beston', 'Flatic']
+
+
+def _with_missing(values, rng, rate=0.02):
+    # 실제 데이터처럼 일부 값을 빈칸(NaN)으로 만듦
+    series = pd.Series(values)
+    return series.mask(rng.random(len(series)) < rate)
+
+
+def generate_passengers(rows, rng, labeled=True):
+    '''train.csv(labeled=True) 또는 test.csv 형식의 합성 승객 데이터를 만든다.'''
+    # 한 그룹에 1~8명, 그룹 번호는 4자리 이상
+    group_sizes = rng.integers(1, 9, size=rows)
+    group_starts = np.cumsum(group_sizes) - group_sizes
+    groups = np.repeat(np.arange(1, rows + 1), group_sizes)[:rows]
+    # 그룹 안에서의 순번 = 행 번호 - 그룹 시작 행 번호 + 1
+    members = np.arange(rows) - np.repeat(group_starts, group_sizes)[:rows] + 1
+    passenger_id = (pd.Series(groups).astype(str).str.zfill(4) + '_'
+                    + pd.Series(members).astype(str).str.zfill(2))
+
+    cryo = rng.random(rows) < 0.35
+    cabin = (pd.Series(rng.choice(DECKS, size=rows)) + '/'
+             + pd.Series(rng.integers(0, 1900, size=rows)).astype(str) + '/'
+             + pd.Series(rng.choice(['P', 'S'], size=rows)))
+    names = (pd.Series(rng.choice(FIRST_NAMES, size=rows)) + ' '
+             + pd.Series(rng.choice(LAST_NAMES, size=rows)))
+
+    data = {
+        'PassengerId': passenger_id,
+        'HomePlanet': _with_missing(rng.choice(PLANETS, size=rows, p=[0.54, 0.25, 0.21]), rng),
+        'CryoSleep': _with_missing(cryo, rng),
+        'Cabin': _with_missing(cabin, rng),
+        'Destination': _with_missing(rng.choice(DESTINATIONS, size=rows, p=[0.69, 0.21, 0.10]), rng),
+        'Age': _with_missing(rng.integers(0, 80, size=rows).astype(float), rng),
+        'VIP': _with_missing(rng.random(rows) < 0.02, rng),
+    }
+    for col in t_main.SPEND_COLUMNS:
+        # 냉동 수면 중인 승객은 지출이 없음
+        spend = np.where(cryo, 0.0, np.round(rng.exponential(300, size=rows) * (rng.random(rows) < 0.4)))
+        data[col] = _with_missing(spend, rng)
+    data['Name'] = _with_missing(names, rng)
+    if labeled:
+        # 냉동 수면 승객일수록 Transported 확률이 높도록 생성
+        data['Transported'] = rng.random(rows) < np.where(cryo, 0.8, 0.35)
+    return pd.DataFrame(data)
+
+
+def prepare_data(rows, seed=0):
+    '''행 수에 맞는 합성 train/test CSV를 만들고(이미 있으면 재사용) 경로를 반환한다.'''
+    os.makedirs(DATA_DIR, exist_ok=True)
+    train_path = os.path.join(DATA_DIR, f'train_{rows}_{seed}.csv')
+    test_path = os.path.join(DATA_DIR, f'test_{rows}_{seed}.csv')
+    if not (os.path.exists(train_path) and os.path.exists(test_path)):
+        rng = np.random.default_rng(seed)
+        # 원본과 비슷하게 Train:Test = 2:1
+        train_rows = rows * 2 // 3
+        generate_passengers(train_rows, rng).to_csv(train_path, index=False)
+        generate_passengers(rows - train_rows, rng, labeled=False).to_csv(test_path, index=False)
+    return train_path, test_path
+
+
+def run_stages(rows, trace_memory=True):
+    '''합성 데이터로 t_main.py의 각 단계를 순서대로 측정한다.'''
+    results = []
+    train_path, test_path = prepare_data(rows)
+    print(f'\n[{rows:,}행]')
+
+    def step(stage, func, *args, **kwargs):
+        return measure(results, rows, stage, func, *args, trace_memory=trace_memory, **kwargs)
+
+    train = step('read_csv(train)', pd.read_csv, train_path)
+    test = step('read_csv(test)', pd.read_csv, test_path)
+    step('print_basic_info(train)', t_main.print_basic_info, train, 'Train')
+    merged = step('concat', pd.concat, [train, test], ignore_index=True)
+    step('apply_compact_schema', t_main.apply_compact_schema, merged)
+    step('classify_age_group(apply)', merged['Age'].apply, t_main.classify_age_group)
+    step('classify_age_groups', t_main.classify_age_groups, merged['Age'])
+    features = step('build_feature_frame', t_main.build_feature_frame, merged)
+    analysis = step('prepare_correlation_data', t_main.prepare_correlation_data, merged, features)
+    age_counts = step('count_age_groups', t_main.count_age_groups, features)
+    accumulator = step('accumulate_covariance', t_main.accumulate_covariance, analysis)
+    corr = accumulator.correlation()['Transported'].drop('Transported')
+    top = corr.abs().sort_values(ascending=False).index[:5]
+
+    plot_dir = os.path.join(DATA_DIR, 'plots')
+    os.makedirs(plot_dir, exist_ok=True)
+    step('plot_age_transported', t_main.plot_age_transported, age_counts,
+         path=os.path.join(plot_dir, 'age_transported.png'), show=False)
+    step('plot_top_correlations', t_main.plot_top_correlations, list(top), [corr[f] for f in top],
+         path=os.path.join(plot_dir, 'correlation_top5.png'), show=False)
+    return results
+
+
+def main():
+    run_benchmark('t_main', run_stages)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+'''stream_stats.py의 누적 통계가 pandas로 한 번에 계산한 결과와 같은지 확인하는 스크립트
+
+- CovarianceAccumulator: 배치 크기와 관계없이, 여러 조각을 merge()로 합쳐도
+  DataFrame.corr()와 같은 상관계수 행렬이 나오는지 확인
+- ColumnProfile: 조각별 프로필을 merge()로 합친 결과가 count(), nunique()와 같은지 확인
+
+사용 예:
+    python check_stats.py
+    python check_stats.py --rows 200000
+'''
+import argparse
+import contextlib
+import io
+
+import numpy as np
+
+import t_main
+from bench import generate_passengers
+from stream_stats import ColumnProfile, CovarianceAccumulator
+
+
+TOLERANCE = 1e-12
+
+
+def correlation_data(rows, seed=0):
+    '''합성 승객 데이터로 t_main.py와 같은 상관계수 분석용 데이터프레임을 만든다.'''
+    rng = np.random.default_rng(seed)
+    data = generate_passengers(rows, rng)
+    features = t_main.build_feature_frame(data)
+    return data, t_main.prepare_correlation_data(data, features)
+
+
+def max_difference(left, right):
+    '''두 상관계수 행렬의 가장 큰 차이를 반환한다. (NaN 위치가 다르면 무한대)'''
+    left, right = left.to_numpy(), right.to_numpy()
+    if not np.array_equal(np.isnan(left), np.isnan(right)):
+        return np.inf
+    return np.nanmax(np.abs(left - right), initial=0.0)
+
+
+def check_covariance(analysis):
+    '''여러 방식으로 누적한 상관계수가 DataFrame.corr()와 같은지 확인한다.'''
+    expected = analysis.corr()
+    results = {}
+    for batch_size in [None, 1000, 997, 7]:
+        accumulator = t_main.accumulate_covariance(analysis, batch_size=batch_size)
+        results[f'batch_size={batch_size}'] = accumulator.correlation()
+
+    for parts in [2, 3, 8]:
+        # 크기가 다른 조각과 행이 없는 조각을 섞어서 merge()
+        partitions = t_main.split_rows(analysis, parts) + [analysis.iloc[:0]]
+        accumulator = CovarianceAccumulator(analysis.columns)
+        for partition in partitions:
+            partial = CovarianceAccumulator(analysis.columns)
+            partial.update(partition)
+            accumulator.merge(partial)
+        results[f'merge({parts}조각)'] = accumulator.correlation()
+
+    # NaN이 있는 행은 제외해야 함 (DataFrame.corr()는 열 쌍마다 제외하므로 NaN 행을 미리 제거해서 비교)
+    with_nan = analysis.astype(float)
+    with_nan.iloc[::7, 0] = np.nan
+    accumulator = CovarianceAccumulator(with_nan.columns)
+    accumulator.update(with_nan)
+    results['NaN 행 제외'] = (accumulator.correlation(), with_nan.dropna().corr())
+
+    failed = 0
+    for name, result in results.items():
+        actual, target = result if isinstance(result, tuple) else (result, expected)
+        difference = max_difference(actual, target)
+        ok = difference <= TOLERANCE
+        failed += not ok
+        print(f"- CovarianceAccumulator {name}: 최대 차이 {difference:.2e} {'OK' if ok else '실패'}")
+    return failed
+
+
+def check_column_profile(data):
+    '''조각별 ColumnProfile을 merge()로 합친 결과가 전체 count(), nunique()와 같은지 확인한다.'''
+    profile = ColumnProfile()
+    profile.update(data.iloc[:0])
+    for partition in t_main.split_rows(data, 4):
+        partial = ColumnProfile()
+        partial.update(partition)
+        profile.merge(partial)
+
+    failed = 0
+    for col in data.columns:
+        counts = (profile.valid_counts[col], profile.unique_count(col))
+        expected = (data[col].count(), data[col].nunique())
+        if counts != expected:
+            failed += 1
+            print(f'- ColumnProfile {col}: {counts} != {expected} 실패')
+    print(f"- ColumnProfile merge(4조각): {len(data.columns)}개 열 {'OK' if not failed else '실패'}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='누적 통계와 pandas 계산 결과 비교')
+    parser.add_argument('--rows', type=int, default=20_000, help='합성 데이터 행 수')
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        data, analysis = correlation_data(args.rows)
+    print(f'=== 합성 데이터 {args.rows:,}행 (상관계수 분석용 {len(analysis):,}행) ===')
+    failed = check_covariance(analysis) + check_column_profile(data)
+    if failed:
+        raise SystemExit(f'{failed}개 항목이 다릅니다.')
+    print('모든 항목이 같습니다.')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,51 @@
+import argparse  # 명령줄 옵션을 읽는 표준 라이브러리
+import os  # 운영체제 정보(CPU 코어 수 등)를 다루는 표준 라이브러리
+import sys  # 모듈 검색 경로(sys.path)를 다루는 표준 라이브러리
+from collections import deque  # 앞뒤로 넣고 뺄 수 있는 대기열
+from concurrent.futures import ProcessPoolExecutor  # 여러 CPU 코어에서 작업을 나눠 실행
+
+import numpy as np  # 숫자 배열을 빠르게 계산하는 라이브러리
 import pandas as pd  # 엑셀과 비슷한 표 형태의 데이터를 다루는 라이브러리
-import matplotlib.pyplot as plt  # 그래프를 그리는 라이브러리
 
+# 4-1, 4-2가 함께 쓰는 모듈(common 폴더)을 import할 수 있도록 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
+
+from csv_cache import output_is_fresh, read_csv_cached, record_output  # 파싱 결과 캐시
+from figure_render import PLOT_MODES, FigureRenderer, load_pyplot  # 그래프 그리기 방식 (matplotlib은 필요할 때 import)
+from stage_profiler import StageProfiler  # 단계별 실행 시간과 메모리 측정
+from stream_stats import ColumnProfile, CovarianceAccumulator, ValueCounter  # 청크 단위 통계 누적
+
+
+# 입력 파일 (데이터 이름 → 파일 경로)과 병합 결과 파일
+INPUT_FILES = {'Train': 'train.csv', 'Test': 'test.csv'}
+MERGED_FILE = 'merged_data.csv'
+
+# 연령대 구간 경계와 라벨 (classify_age_group과 같은 기준)
+AGE_BINS = [-np.inf, 20, 30, 40, 50, 60, 70, np.inf]
+AGE_LABELS = ['10대', '20대', '30대', '40대', '50대', '60대', '70대 이상']
+
+# 지출, 불리언, 범주형 컬럼 목록
+SPEND_COLUMNS = ['RoomService', 'FoodCourt', 'ShoppingMall', 'Spa', 'VRDeck']
+BOOLEAN_COLUMNS = ['CryoSleep', 'VIP']
+CATEGORICAL_COLUMNS = ['HomePlanet', 'Destination']
+
+# 상관계수 계산에 사용할 숫자형 컬럼 목록
+CORRELATION_COLUMNS = ['Age', *SPEND_COLUMNS, *BOOLEAN_COLUMNS, *CATEGORICAL_COLUMNS, 'Transported']
+
+# 메모리를 적게 쓰는 컬럼별 타입 (apply_compact_schema에서 사용)
+# category: 종류가 적은 문자열, boolean: NaN을 허용하는 True/False, float32: 4바이트 실수
+COMPACT_DTYPES = {
+    **{col: 'category' for col in CATEGORICAL_COLUMNS},
+    **{col: 'boolean' for col in [*BOOLEAN_COLUMNS, 'Transported']},
+    **{col: 'float32' for col in ['Age', *SPEND_COLUMNS]},
+}
 
-# MacOS 한글 폰트 설정 (그래프에서 한글이 깨지지 않도록)
-plt.rcParams['font.family'] = 'AppleGothic'  # 애플고딕 폰트 사용
-plt.rcParams['axes.unicode_minus'] = False  # 마이너스 기호가 깨지지 않도록 설정
+# Cabin('B/0/P')과 PassengerId('0001_01')를 나누는 정규식
+# 원래 문자열로 정확히 되돌릴 수 있는 형식일 때만 나눔
+# 그룹 번호는 4자리(0001) 또는 0으로 시작하지 않는 5자리 이상(13341)이면 zfill(4)로 되돌릴 수 있음
+# (9자리까지만 허용해서 Int32 범위를 넘지 않게 함)
+CABIN_PATTERN = r'^([^/]+)/(0|[1-9][0-9]*)/([^/]+)$'
+PASSENGER_ID_PATTERN = r'^([0-9]{4}|[1-9][0-9]{4,8})_([0-9]{2})$'
 
 
 def print_basic_info(df, name):
@@ -27,6 +68,171 @@ def print_basic_info(df, name):
         print(f'- {col}: 유효한 값={non_null_count}, 고유값={unique_count}')
 
 
+def print_profile_info(profile, name):
+    '''청크 단위로 누적한 열 통계(ColumnProfile)를 print_basic_info와 같은 형식으로 출력한다.
+    
+    profile: stream_stats.ColumnProfile 객체
+    name: 데이터 이름 (Train, Test, Merged)
+    '''
+    print(f'\n[{name}] 데이터 정보')
+    print(f'총 행 수: {profile.rows}')
+    print(f'총 열 수: {len(profile.columns)}')
+    print('\n열별 정보:')
+
+    for col in profile.columns:
+        non_null_count = profile.valid_counts[col]
+        unique_count = profile.unique_count(col)
+        print(f'- {col}: 유효한 값={non_null_count}, 고유값={unique_count}')
+
+
+def _merged_columns(input_files):
+    # 헤더만 읽어서 병합 결과의 열 순서를 정함 (pd.concat과 같은 순서)
+    merged_columns = []
+    for path in input_files.values():
+        for col in pd.read_csv(path, nrows=0).columns:
+            if col not in merged_columns:
+                merged_columns.append(col)
+    return merged_columns
+
+
+def merge_in_chunks(input_files, output_path, chunksize, unique='exact'):
+    '''여러 CSV 파일을 청크 단위로 읽으면서 병합 파일에 이어 쓴다.
+    
+    파일 전체를 메모리에 올리지 않으므로 입력 크기와 관계없이 메모리 사용량이 일정함
+    (행은 남기지 않고 열 통계와 피처 기준 값만 누적, 단 unique='exact'는 열마다 고유값 집합을
+    보관하므로 PassengerId처럼 값이 모두 다른 열은 행 수만큼 늘어남)
+    input_files: {데이터 이름: 파일 경로} 딕셔너리 (예: INPUT_FILES)
+    output_path: 병합 결과를 저장할 CSV 파일 경로 (None이면 저장하지 않음)
+    chunksize: 한 번에 읽을 행 수
+    unique: 고유값 계산 방식 ('exact' 또는 'hll')
+    반환: ({데이터 이름: ColumnProfile}, feature_parameters()와 같은 전체 기준 값)
+    '''
+    merged_columns = _merged_columns(input_files)
+
+    profiles = {name: ColumnProfile(unique) for name in input_files}
+    profiles['Merged'] = ColumnProfile(unique)
+    # 나이 중앙값은 나이별 인원 수로, 범주 순서는 처음 나온 순서를 기억하는 dict로 구함
+    # (메모리는 행 수가 아니라 나이, 범주의 종류 수에 비례)
+    ages = ValueCounter()
+    categories = {col: {} for col in CATEGORICAL_COLUMNS if col in merged_columns}
+
+    # 파일을 한 번만 열고 청크마다 이어서 씀 (헤더와 BOM은 처음 한 번만 기록)
+    output = open(output_path, 'w', encoding='utf-8-sig', newline='') if output_path else None
+    try:
+        write_header = True
+        for name, path in input_files.items():
+            for chunk in pd.read_csv(path, chunksize=chunksize):
+                profiles[name].update(chunk)
+
+                # 없는 열은 NaN으로 채워서 병합 결과의 열 순서에 맞춤
+                merged_chunk = chunk.reindex(columns=merged_columns)
+                profiles['Merged'].update(merged_chunk)
+                if output is not None:
+                    merged_chunk.to_csv(output, index=False, header=write_header)
+                    write_header = False
+
+                # 피처 기준 값은 Transported 값이 있는 행(Train)으로 구함
+                if 'Transported' in chunk.columns:
+                    labeled = merged_chunk[merged_chunk['Transported'].notna()]
+                    if 'Age' in merged_columns:
+                        ages.update(labeled['Age'])
+                    for col, seen in categories.items():
+                        # 이미 있는 키는 자리를 유지하므로 전체에서 처음 나온 순서가 됨
+                        seen.update(dict.fromkeys(labeled[col].dropna().unique()))
+    finally:
+        if output is not None:
+            output.close()
+
+    params = {'categories': {col: list(seen) for col, seen in categories.items()}}
+    if 'Age' in merged_columns:
+        params['age_median'] = ages.median()
+    return profiles, params
+
+
+def _replace_column(df, col, new_columns):
+    '''df의 col 열을 같은 위치에 new_columns(데이터프레임)의 열들로 바꾼다.'''
+    position = df.columns.get_loc(col)
+    return pd.concat([df.iloc[:, :position], new_columns, df.iloc[:, position + 1:]], axis=1)
+
+
+def _report_unsplit(values, parts):
+    # 형식이 다른 값이 있어서 열을 나누지 않았다는 것을 알림 (원래 문자열 열은 그대로 둠)
+    mismatched = values[values.notna() & parts[0].isna()]
+    print(f'{values.name}: 형식이 다른 값 {len(mismatched):,}개가 있어서 열을 나누지 않았습니다 '
+          f'(예: {mismatched.iloc[0]!r})')
+
+
+def apply_compact_schema(df):
+    '''데이터프레임을 메모리를 적게 쓰는 타입으로 변환한다.
+    
+    - HomePlanet, Destination → category
+    - CryoSleep, VIP, Transported → NaN을 허용하는 boolean
+    - Age, 지출 항목 → float32
+    - Cabin → CabinDeck(category) / CabinNum(정수) / CabinSide(category)
+    - PassengerId → PassengerGroup / PassengerMember (정수)
+    restore_original_columns()로 Cabin, PassengerId를 원래 문자열로 되돌릴 수 있음
+    (되돌릴 수 없는 형식의 값이 있으면 그 열은 나누지 않고 출력으로 알림)
+    '''
+    dtypes = {col: dtype for col, dtype in COMPACT_DTYPES.items() if col in df.columns}
+    compact = df.astype(dtypes)
+
+    if 'Cabin' in compact.columns:
+        # str.extract()는 정규식의 괄호 부분을 열로 나눔 (형식이 다르면 NaN)
+        parts = compact['Cabin'].str.extract(CABIN_PATTERN)
+        if parts[0].count() == compact['Cabin'].count():
+            cabin = pd.DataFrame({
+                'CabinDeck': parts[0].astype('category'),
+                'CabinNum': pd.to_numeric(parts[1]).astype('Int32'),
+                'CabinSide': parts[2].astype('category'),
+            })
+            compact = _replace_column(compact, 'Cabin', cabin)
+        else:
+            _report_unsplit(compact['Cabin'], parts)
+
+    if 'PassengerId' in compact.columns:
+        parts = compact['PassengerId'].str.extract(PASSENGER_ID_PATTERN)
+        if parts[0].count() == compact['PassengerId'].count():
+            passenger = pd.DataFrame({
+                'PassengerGroup': pd.to_numeric(parts[0]).astype('Int32'),
+                'PassengerMember': pd.to_numeric(parts[1]).astype('Int8'),
+            })
+            compact = _replace_column(compact, 'PassengerId', passenger)
+        else:
+            _report_unsplit(compact['PassengerId'], parts)
+
+    return compact
+
+
+def restore_original_columns(df):
+    '''apply_compact_schema()에서 나눈 Cabin, PassengerId를 원래 문자열 열로 되돌린다.'''
+    restored = df
+    if 'CabinDeck' in restored.columns:
+        # string 타입끼리 더하면 하나라도 값이 없을 때 결과도 없는 값(<NA>)이 됨
+        cabin = (restored['CabinDeck'].astype('string') + '/'
+                 + restored['CabinNum'].astype('string') + '/'
+                 + restored['CabinSide'].astype('string'))
+        restored = _replace_column(restored, 'CabinDeck', cabin.astype(object).rename('Cabin'))
+        restored = restored.drop(columns=['CabinNum', 'CabinSide'])
+    if 'PassengerGroup' in restored.columns:
+        # zfill()은 앞을 0으로 채워서 자릿수를 맞춤 (1 → '0001')
+        passenger_id = (restored['PassengerGroup'].astype('string').str.zfill(4) + '_'
+                        + restored['PassengerMember'].astype('string').str.zfill(2))
+        restored = _replace_column(restored, 'PassengerGroup', passenger_id.astype(object).rename('PassengerId'))
+        restored = restored.drop(columns=['PassengerMember'])
+    return restored
+
+
+def compact_with_report(df, name):
+    '''apply_compact_schema()를 적용하고 변환 전후 메모리 사용량을 출력한다.'''
+    # memory_usage(deep=True)는 문자열 내용까지 포함한 실제 메모리 사용량(바이트)
+    before = df.memory_usage(deep=True).sum()
+    compact = apply_compact_schema(df)
+    after = compact.memory_usage(deep=True).sum()
+    print(f'[{name}] 메모리 사용량: {before / 1024 ** 2:.2f}MB → {after / 1024 ** 2:.2f}MB '
+          f'({after / max(before, 1) * 100:.0f}%)')
+    return compact
+
+
 def classify_age_group(age):
     '''나이를 연령대로 분류한다.
     
@@ -51,227 +257,568 @@ def classify_age_group(age):
     return '70대 이상'
 
 
+def classify_age_groups(ages):
+    '''나이 열 전체를 한 번에 연령대로 분류한다. (classify_age_group의 열 단위 버전)
+    
+    ages: 나이 열
+    반환: 연령대 라벨을 가진 범주형(category) 열, 나이가 없으면 NaN
+    '''
+    # pd.cut()은 값을 구간(bin)별로 한 번에 나눔
+    # right=False는 '20 이상 30 미만'처럼 왼쪽 경계를 포함하는 구간
+    return pd.cut(ages, bins=AGE_BINS, labels=AGE_LABELS, right=False)
+
+
 def convert_boolean_column(series):
     '''불리언 컬럼을 안전하게 0/1로 변환한다.
     
     series: True/False 값을 가진 열
     반환: 0/1로 변환된 열
     '''
-    # series.dtype은 데이터 타입을 확인
-    if series.dtype == 'object':  # 'object'는 문자열 타입
-        # map()은 값을 변환하는 메소드
-        # 'True' 문자열 → 1, 'False' 문자열 → 0으로 변환
-        result = series.map({'True': 1, 'False': 0, True: 1, False: 0})
-    elif series.dtype == 'bool':  # 불리언 타입인 경우
+    # is_bool_dtype()은 불리언 타입인지 확인
+    if pd.api.types.is_bool_dtype(series.dtype):
         # astype(int)는 데이터 타입을 정수로 변환 (True→1, False→0)
-        result = series.astype(int)
-    else:
-        result = series
+        return series.fillna(False).astype(int)
+    # 숫자형이 아니면 문자열 타입 ('True', 'False' 문자열이나 섞인 값)
+    if not pd.api.types.is_numeric_dtype(series.dtype):
+        # isin()은 각 값이 목록에 들어 있는지 한 번에 검사
+        # True 또는 'True' → 1, 나머지('False', NaN 등) → 0
+        return series.isin([True, 'True']).astype(int)
     # fillna(0)은 NaN 값을 0으로 채움
-    return result.fillna(0).astype(int)
+    return series.fillna(0).astype(int)
 
 
-def prepare_correlation_data(data):
-    '''상관계수 계산을 위한 데이터 전처리 후 숫자형 데이터프레임을 반환한다.
+def encode_categories(series, categories=None):
+    '''범주형 변수(문자열)를 처음 등장한 순서대로 0, 1, 2... 정수로 인코딩한다.
     
-    상관계수는 숫자끼리만 계산할 수 있으므로 모든 데이터를 숫자로 변환
+    예: ['Earth', 'Mars', 'Earth'] → [0, 1, 0], NaN은 NaN으로 유지
+    categories: 미리 정한 범주 순서 (데이터를 나눠 처리할 때 같은 번호를 쓰기 위해 사용)
     '''
-    # Transported 값이 있는 행만 필터링 (Train 데이터만 사용)
-    # copy()는 원본 데이터를 보호하기 위해 복사본을 만듦
-    corr_data = data[data['Transported'].notna()].copy()
+    if categories is None:
+        # factorize()는 고유값에 등장 순서대로 번호를 매김 (NaN은 -1)
+        codes, _ = pd.factorize(series)
+    else:
+        # get_indexer()는 각 값이 categories의 몇 번째인지 찾음 (없으면 -1)
+        codes = pd.Index(categories).get_indexer(series)
+    # np.where()로 -1을 NaN으로 되돌림
+    return pd.Series(np.where(codes < 0, np.nan, codes), index=series.index)
 
-    # Transported를 정수(1/0)로 변환
-    corr_data['Transported'] = convert_boolean_column(corr_data['Transported'])
+
+def feature_parameters(data):
+    '''피처 계산에 필요한 전체 데이터 기준 값(나이 중앙값, 범주 순서)을 구한다.
+    
+    데이터를 여러 조각으로 나눠 build_feature_frame()을 실행해도
+    한 번에 실행한 것과 같은 결과가 나오도록 미리 계산해서 넘겨줌
+    반환: build_feature_frame()에 넘길 키워드 인자 딕셔너리
+    '''
+    train = data[data['Transported'].notna()]
+    params = {'categories': {}}
+    if 'Age' in train.columns:
+        params['age_median'] = train['Age'].median()
+    for col in CATEGORICAL_COLUMNS:
+        if col in train.columns:
+            # unique()는 처음 등장한 순서대로 고유값을 반환
+            params['categories'][col] = train[col].dropna().unique()
+    return params
+
+
+def build_feature_frame(data, age_median=None, categories=None):
+    '''Transported 값이 있는 행(Train)에 대해 분석용 피처를 한 번에 계산한다.
+    
+    연령대 그래프(5단계)와 상관계수 분석(6단계)이 같은 결과를 재사용하도록
+    연령대, 0/1 불리언, 범주 코드, 결측값 처리를 모두 열 단위 연산으로 수행
+    age_median, categories: feature_parameters()로 구한 전체 기준 값 (없으면 data에서 계산)
+    반환: AgeGroup과 상관계수용 숫자 컬럼을 가진 데이터프레임
+    '''
+    categories = categories or {}
+    # Transported 값이 있는 행만 사용 (Train 데이터만 사용)
+    train = data[data['Transported'].notna()]
+    features = pd.DataFrame(index=train.index)
+
+    if 'Age' in train.columns:
+        # 연령대는 결측값을 채우기 전의 나이로 분류
+        features['AgeGroup'] = classify_age_groups(train['Age'])
+        # 나이는 중앙값으로 채움 (median()은 데이터를 정렬했을 때 가운데 값)
+        if age_median is None:
+            age_median = train['Age'].median()
+        features['Age'] = train['Age'].fillna(age_median)
+
+    # 지출 관련 항목은 0원 지출로 간주
+    for col in SPEND_COLUMNS:
+        if col in train.columns:
+            features[col] = train[col].fillna(0)
 
     # 불리언 컬럼들을 1/0으로 변환
-    # 리스트 컴프리헨션: 조건에 맞는 요소만 모아서 리스트 생성
-    boolean_columns = [col for col in ['CryoSleep', 'VIP'] if col in corr_data.columns]
-    for col in boolean_columns:
-        corr_data[col] = convert_boolean_column(corr_data[col])
+    for col in BOOLEAN_COLUMNS:
+        if col in train.columns:
+            features[col] = convert_boolean_column(train[col])
 
     # 범주형 변수(문자열)를 정수로 인코딩
-    categorical_columns = [col for col in ['HomePlanet', 'Destination'] if col in corr_data.columns]
-    for col in categorical_columns:
-        # dropna()는 NaN 제거, unique()는 중복 제거한 고유값 반환
-        unique_vals = corr_data[col].dropna().unique()
-        # enumerate()는 인덱스(0,1,2...)와 값을 함께 반환
-        # 예: ['Earth', 'Mars'] → Earth=0, Mars=1
-        mapping = {val: idx for idx, val in enumerate(unique_vals)}
-        # map()으로 문자열을 숫자로 변환
-        corr_data[col] = corr_data[col].map(mapping)
-
-    # 상관계수 계산에 사용할 숫자형 컬럼 목록
-    candidate_columns = [
-        'Age', 'RoomService', 'FoodCourt', 'ShoppingMall', 'Spa', 'VRDeck',
-        'CryoSleep', 'VIP', 'HomePlanet', 'Destination', 'Transported'
-    ]
-    # 실제로 데이터에 존재하는 컬럼만 선택
-    present_cols = [c for c in candidate_columns if c in corr_data.columns]
+    for col in CATEGORICAL_COLUMNS:
+        if col in train.columns:
+            features[col] = encode_categories(train[col], categories.get(col))
 
-    # 결측값(NaN) 처리
-    for col in present_cols:
-        # 지출 관련 항목은 0원 지출로 간주
-        if col in ['RoomService', 'FoodCourt', 'ShoppingMall', 'Spa', 'VRDeck']:
-            corr_data[col] = corr_data[col].fillna(0)
-        # 나이는 중앙값으로 채움 (median()은 데이터를 정렬했을 때 가운데 값)
-        elif col == 'Age':
-            corr_data[col] = corr_data[col].fillna(corr_data[col].median())
+    # Transported를 정수(1/0)로 변환
+    features['Transported'] = convert_boolean_column(train['Transported'])
+
+    return features
+
+
+def prepare_correlation_data(data, features=None):
+    '''상관계수 계산을 위한 데이터 전처리 후 숫자형 데이터프레임을 반환한다.
+    
+    상관계수는 숫자끼리만 계산할 수 있으므로 모든 데이터를 숫자로 변환
+    features: build_feature_frame()으로 미리 계산한 피처 (없으면 새로 계산)
+    '''
+    if features is None:
+        features = build_feature_frame(data)
+
+    # 실제로 데이터에 존재하는 컬럼만 선택
+    present_cols = [c for c in CORRELATION_COLUMNS if c in features.columns]
 
     # 여전히 NaN이 남아있는 행을 제거
-    analysis_data = corr_data[present_cols].dropna()
+    analysis_data = features[present_cols].dropna()
 
     return analysis_data
 
 
-def main():
-    # ========== 1단계: CSV 파일 읽기 ==========
-    # read_csv()는 CSV 파일을 읽어서 표 형태의 데이터프레임으로 변환
-    train_data = pd.read_csv('train.csv')
-    test_data = pd.read_csv('test.csv')
+def count_age_groups(features):
+    '''연령대별 Transported 인원 수 표를 만든다.
+    
+    반환: 행은 연령대(AGE_LABELS 순서), 열은 Transported 0/1인 정수 데이터프레임
+    '''
+    # AgeGroup에 NaN이 있는 행 제거
+    age_df = features.dropna(subset=['AgeGroup'])
+    if age_df.empty:
+        empty = pd.DataFrame(0, index=pd.Index(AGE_LABELS, name='AgeGroup'),
+                             columns=pd.Index([0, 1], name='Transported'))
+        return empty
+
+    # groupby()는 그룹별로 데이터를 묶음
+    # size()는 각 그룹의 개수를 세고
+    # unstack()은 데이터를 표 형태로 펼침
+    age_counts = age_df.groupby(['AgeGroup', 'Transported'], observed=False).size().unstack(fill_value=0)
 
-    # ========== 2단계: 데이터 구조 확인 ==========
-    # 앞에서 정의한 함수를 호출하여 Train, Test 데이터 정보 출력
-    print_basic_info(train_data, 'Train')
-    print_basic_info(test_data, 'Test')
+    # reindex()는 원하는 순서대로 행을 재배열 (연령대를 순서대로 정렬)
+    age_counts = age_counts.reindex(AGE_LABELS).fillna(0)
+    # 열도 0(False), 1(True) 순서로 정렬하고 정수형으로 변환
+    return age_counts.reindex(columns=[0, 1], fill_value=0).astype(int)
 
-    # ========== 3단계: 데이터 병합 ==========
-    # concat()은 여러 데이터프레임을 위아래로 연결
-    # ignore_index=True는 인덱스를 0부터 다시 매김
-    merged_data = pd.concat([train_data, test_data], ignore_index=True)
+
+def accumulate_covariance(analysis_data, batch_size=None):
+    '''숫자형 데이터프레임의 평균과 공분산을 배치 단위로 누적한다.
     
-    # 병합된 데이터 정보 출력
-    print_basic_info(merged_data, 'Merged')
+    batch_size: 한 번에 누적할 행 수 (없으면 전체를 한 번에 누적)
+    반환: CovarianceAccumulator (correlation()으로 DataFrame.corr()와 같은 행렬을 구함)
+    '''
+    accumulator = CovarianceAccumulator(analysis_data.columns)
+    step = batch_size or max(len(analysis_data), 1)
+    for start in range(0, len(analysis_data), step):
+        accumulator.update(analysis_data.iloc[start:start + step])
+    return accumulator
+
+
+def split_rows(df, parts):
+    '''데이터프레임을 행 기준으로 parts개의 조각으로 나눈다.'''
+    bounds = np.linspace(0, len(df), parts + 1).astype(int)
+    partitions = [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+    return partitions or [df]
+
+
+def _profile_partition(partition):
+    # 프로세스 풀에서 실행: 조각 하나의 열 통계
+    profile = ColumnProfile()
+    profile.update(partition)
+    return profile
+
+
+def _analyze_partition(partition, params):
+    # 프로세스 풀에서 실행: 조각 하나의 연령대 인원 수와 공분산 누적 결과
+    features = build_feature_frame(partition, **params)
+    analysis_data = prepare_correlation_data(partition, features)
+    return count_age_groups(features), accumulate_covariance(analysis_data)
+
+
+def profile_in_parallel(executor, df, workers):
+    '''데이터프레임을 조각으로 나눠 여러 프로세스에서 열 통계를 구한 뒤 합친다.'''
+    profile = ColumnProfile()
+    # 행이 없는 조각으로 먼저 누적해서 열 목록과 순서를 유지
+    profile.update(df.iloc[:0])
+    for partial in executor.map(_profile_partition, split_rows(df, workers)):
+        profile.merge(partial)
+    return profile
+
+
+def analyze_in_parallel(executor, data, workers):
+    '''병합 데이터를 조각으로 나눠 연령대 인원 수와 공분산을 여러 프로세스에서 구한 뒤 합친다.
     
-    # 병합된 데이터를 CSV 파일로 저장
-    # index=False는 인덱스 번호를 저장하지 않음
-    # encoding='utf-8-sig'는 한글이 깨지지 않도록 인코딩 설정
-    merged_data.to_csv('merged_data.csv', index=False, encoding='utf-8-sig')
-    print('\n병합된 데이터를 merged_data.csv 파일로 저장했습니다.')
+    나이 중앙값과 범주 순서는 전체 데이터 기준으로 먼저 계산해서 넘기므로
+    결과는 한 프로세스에서 계산한 것과 같음
+    반환: (연령대별 인원 수 표, CovarianceAccumulator)
+    '''
+    params = feature_parameters(data)
+    partitions = split_rows(data, workers)
+    results = list(executor.map(_analyze_partition, partitions, [params] * len(partitions)))
+
+    age_counts = sum(counts for counts, _ in results)
+    accumulator = results[0][1]
+    for _, partial in results[1:]:
+        accumulator.merge(partial)
+    return age_counts, accumulator
+
+
+def _labeled_chunks(input_files, chunksize, analysis_columns, compact=False):
+    # Transported 열이 있는 파일에서 분석용 컬럼만 청크 단위로 읽어 값이 있는 행만 돌려줌
+    for path in input_files.values():
+        header = pd.read_csv(path, nrows=0).columns
+        if 'Transported' not in header:
+            continue
+        usecols = [c for c in analysis_columns if c in header]
+        for chunk in pd.read_csv(path, chunksize=chunksize, usecols=usecols):
+            part = chunk[chunk['Transported'].notna()].reindex(columns=analysis_columns)
+            yield apply_compact_schema(part) if compact else part
+
+
+def _analyze_chunks(chunks, params, executor=None, workers=1):
+    # 청크별 (연령대 인원 수, 공분산 누적 결과)를 순서대로 돌려줌
+    # 프로세스 풀에서는 workers개를 처리하는 동안 다음 청크를 읽되, 그보다 많이 쌓아 두지 않음
+    if executor is None:
+        for part in chunks:
+            yield _analyze_partition(part, params)
+        return
+    pending = deque()
+    for part in chunks:
+        pending.append(executor.submit(_analyze_partition, part, params))
+        if len(pending) > workers:
+            yield pending.popleft().result()
+    for future in pending:
+        yield future.result()
 
-    # ========== 4단계: 연령대 컬럼 생성 ==========
-    # apply()는 각 행에 함수를 적용
-    # Age 열의 각 값을 classify_age_group 함수에 넣어서 연령대로 변환
-    merged_data['AgeGroup'] = merged_data['Age'].apply(classify_age_group)
 
-    # ========== 5단계: 연령대별 Transported 그래프 ==========
-    # Train 데이터만 추출 (Transported 값이 있는 데이터)
-    train_only = merged_data[merged_data['Transported'].notna()].copy()
-    # AgeGroup에 NaN이 있는 행 제거
-    age_df = train_only.dropna(subset=['AgeGroup'])
+def analyze_in_chunks(input_files, chunksize, params, compact=False, executor=None, workers=1):
+    '''Train 파일을 청크 단위로 다시 읽으면서 연령대 인원 수와 공분산을 누적한다.
     
-    if not age_df.empty:
-        # groupby()는 그룹별로 데이터를 묶음
-        # size()는 각 그룹의 개수를 세고
-        # unstack()은 데이터를 표 형태로 펼침
-        age_counts = age_df.groupby(['AgeGroup', 'Transported']).size().unstack(fill_value=0)
-
-        # 연령대를 순서대로 정렬
-        age_order = ['10대', '20대', '30대', '40대', '50대', '60대', '70대 이상']
-        # reindex()는 원하는 순서대로 행을 재배열
-        age_counts = age_counts.reindex(age_order).fillna(0)
-        # 열도 False, True 순서로 정렬하고 정수형으로 변환
-        age_counts = age_counts.reindex(columns=[False, True], fill_value=0).astype(int)
-
-        # 열 이름을 한글로 변경 (그래프에서 보기 좋게)
-        plot_df = age_counts.rename(columns={False: '전송되지 않음', True: '전송됨'})
-        
-        # plot()으로 막대 그래프 그리기
-        # kind='bar': 막대 그래프
-        # figsize=(12, 6): 그래프 크기 (가로 12인치, 세로 6인치)
-        # color: 막대 색상 (빨강, 청록색)
-        # rot=0: x축 라벨 회전 각도 (0도는 회전 없음)
-        ax = plot_df.plot(kind='bar', figsize=(12, 6), color=['#FF6B6B', '#4ECDC4'], rot=0)
-        
-        # 그래프 꾸미기
-        ax.set_title('연령대별 Transported 여부', fontsize=16)  # 제목
-        ax.set_xlabel('연령대', fontsize=12)  # x축 라벨
-        ax.set_ylabel('인원 수', fontsize=12)  # y축 라벨
-        ax.legend(loc='upper right')  # 범례를 오른쪽 위에 배치
-        
-        # tight_layout()은 그래프 요소들이 겹치지 않도록 자동 조정
-        plt.tight_layout()
-        # 그래프를 파일로 저장 (dpi=300은 고해상도)
-        plt.savefig('age_transported.png', dpi=300)
-        # 그래프를 화면에 표시
-        plt.show()
+    merge_in_chunks()로 구한 전체 기준 값으로 청크마다 피처를 계산하므로,
+    행을 모아 두지 않아도 한 번에 계산한 것과 같은 결과가 나옴
+    executor가 있으면 청크를 프로세스 풀에서 처리 (한 번에 workers + 1개 청크까지만 보냄)
+    반환: (연령대별 인원 수 표, CovarianceAccumulator)
+    '''
+    analysis_columns = [c for c in CORRELATION_COLUMNS if c in _merged_columns(input_files)]
+    chunks = _labeled_chunks(input_files, chunksize, analysis_columns, compact)
+
+    # 행이 없는 표(모두 0)와 빈 누적 결과에서 시작
+    age_counts = count_age_groups(pd.DataFrame(columns=['AgeGroup', 'Transported']))
+    accumulator = CovarianceAccumulator(analysis_columns)
+    for counts, partial in _analyze_chunks(chunks, params, executor, workers):
+        age_counts += counts
+        accumulator.merge(partial)
+    return age_counts, accumulator
+
+
+def load_korean_pyplot():
+    '''matplotlib.pyplot을 처음 그래프를 그릴 때 import하고 한글 폰트를 설정한다.'''
+    plt = load_pyplot()
+    # MacOS 한글 폰트 설정 (그래프에서 한글이 깨지지 않도록)
+    plt.rcParams['font.family'] = 'AppleGothic'  # 애플고딕 폰트 사용
+    plt.rcParams['axes.unicode_minus'] = False  # 마이너스 기호가 깨지지 않도록 설정
+    return plt
 
-        # 연령대별 전송 비율 계산
-        print('\n연령대별 전송 비율(%)')
-        # sum(axis=1)은 각 행의 합계 계산 (연령대별 총 인원)
-        total_by_age = age_counts.sum(axis=1).replace(0, pd.NA)
-        # 전송된 사람 수 / 전체 인원 * 100 = 퍼센트
-        # round(2)는 소수점 둘째 자리까지 반올림
-        age_rate = (age_counts[True] / total_by_age * 100).round(2)
-        for age_group, rate in age_rate.items():
-            value = 'N/A' if pd.isna(rate) else f'{rate}%'
-            print(f'- {age_group}: {value}')
+
+def plot_age_transported(age_counts, path='age_transported.png', show=True):
+    '''연령대별 Transported 인원 수를 막대 그래프로 그려서 저장한다.
+    
+    age_counts: count_age_groups()로 만든 연령대별 인원 수 표
+    path: 저장할 이미지 파일 경로
+    show: True이면 그래프를 화면에 표시
+    '''
+    plt = load_korean_pyplot()
+    # 열 이름을 한글로 변경 (그래프에서 보기 좋게)
+    plot_df = age_counts.rename(columns={0: '전송되지 않음', 1: '전송됨'})
+    
+    # plot()으로 막대 그래프 그리기
+    # kind='bar': 막대 그래프
+    # figsize=(12, 6): 그래프 크기 (가로 12인치, 세로 6인치)
+    # color: 막대 색상 (빨강, 청록색)
+    # rot=0: x축 라벨 회전 각도 (0도는 회전 없음)
+    ax = plot_df.plot(kind='bar', figsize=(12, 6), color=['#FF6B6B', '#4ECDC4'], rot=0)
+    
+    # 그래프 꾸미기
+    ax.set_title('연령대별 Transported 여부', fontsize=16)  # 제목
+    ax.set_xlabel('연령대', fontsize=12)  # x축 라벨
+    ax.set_ylabel('인원 수', fontsize=12)  # y축 라벨
+    ax.legend(loc='upper right')  # 범례를 오른쪽 위에 배치
+    
+    # tight_layout()은 그래프 요소들이 겹치지 않도록 자동 조정
+    plt.tight_layout()
+    # 그래프를 파일로 저장 (dpi=300은 고해상도)
+    plt.savefig(path, dpi=300)
+    # 그래프를 화면에 표시 (show=False이면 그래프를 닫기만 함)
+    if show:
+        plt.show()
     else:
-        print('\n연령 정보가 없어 연령대별 그래프를 생성할 수 없습니다.')
+        plt.close(ax.figure)
 
-    # ========== 6단계: 상관계수 분석 ==========
-    # 앞에서 정의한 함수로 데이터를 전처리
-    analysis_data = prepare_correlation_data(merged_data)
+
+def plot_top_correlations(top_idx, top_vals, path='correlation_top5.png', show=True):
+    '''상관계수 상위 항목을 가로 막대 그래프로 그려서 저장한다.
+    
+    top_idx: 항목 이름 목록, top_vals: 각 항목의 상관계수
+    path: 저장할 이미지 파일 경로
+    show: True이면 그래프를 화면에 표시
+    '''
+    plt = load_korean_pyplot()
+    # 양수는 초록색, 음수는 빨간색으로 표시
+    colors = ['#2E7D32' if v > 0 else '#C62828' for v in top_vals]
+
+    # subplots()로 새로운 그래프 생성
+    fig, ax = plt.subplots(figsize=(10, 6))
     
-    print(f'\n상관계수 분석에 사용된 데이터 수: {len(analysis_data)}')
+    # barh()는 가로 막대 그래프
+    # range(len(top_idx))는 y축 위치 (0, 1, 2, 3, 4)
+    ax.barh(range(len(top_idx)), top_vals, color=colors)
     
-    if analysis_data.empty or len(analysis_data) < 2:
-        print('\n상관계수 분석을 위한 유효한 숫자 데이터가 충분하지 않습니다.')
-        return
+    # y축에 항목 이름 표시
+    ax.set_yticks(range(len(top_idx)))
+    ax.set_yticklabels(top_idx)
+    
+    ax.set_xlabel('상관계수', fontsize=12)
+    ax.set_title('Transported와 상관관계 상위 5개 항목', fontsize=14)
+    
+    # axvline()은 수직선 그리기 (x=0 위치에 양수/음수 구분선)
+    ax.axvline(x=0, color='black', linestyle='-', linewidth=0.5)
+    
+    plt.tight_layout()
+    plt.savefig(path, dpi=300)
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
-    # corr()은 상관계수 행렬을 계산
-    # 모든 열 간의 상관관계를 계산하여 표로 만듦 (-1 ~ 1 사이의 값)
-    corr_mat = analysis_data.corr()
-    # Transported 열만 추출하고, 자기 자신(Transported)은 제거
-    transported_corr = corr_mat['Transported'].drop('Transported')
 
-    # 절댓값 기준으로 내림차순 정렬 (큰 값부터)
-    # abs()는 절댓값, sort_values()는 정렬
-    transported_corr_sorted = transported_corr.reindex(transported_corr.abs().sort_values(ascending=False).index)
+def save_merged_data(merged_data, use_cache=True):
+    '''병합된 데이터를 CSV 파일로 저장한다. 입력 파일이 그대로면 저장을 건너뛴다.'''
+    if use_cache and output_is_fresh(MERGED_FILE, INPUT_FILES.values()):
+        print(f'\n{MERGED_FILE} 파일이 이미 최신 상태라서 저장을 건너뜁니다.')
+        return
+    # 나눠 둔 Cabin, PassengerId는 원래 형식으로 되돌려서 저장
+    merged_data = restore_original_columns(merged_data)
+    # index=False는 인덱스 번호를 저장하지 않음
+    # encoding='utf-8-sig'는 한글이 깨지지 않도록 인코딩 설정
+    merged_data.to_csv(MERGED_FILE, index=False, encoding='utf-8-sig')
+    if use_cache:
+        record_output(MERGED_FILE, INPUT_FILES.values())
+    print(f'\n병합된 데이터를 {MERGED_FILE} 파일로 저장했습니다.')
 
-    # 상관계수 출력
-    print('\nTransported와의 상관계수 (절댓값 기준 내림차순):')
-    for feature, value in transported_corr_sorted.items():
-        print(f'- {feature}: {value:.4f}')
 
-    # ========== 7단계: 상위 5개 항목 시각화 ==========
-    # 상관계수 상위 5개 항목만 추출
-    top_idx = list(transported_corr_sorted.index[:5])
+def main(chunksize=None, unique='exact', use_cache=True, workers=1, compact=False, profiler=None, plots='show'):
+    '''분석 전체를 실행한다.
     
-    if top_idx:
-        # 상위 5개의 상관계수 값
-        top_vals = [transported_corr[feat] for feat in top_idx]
-        # 양수는 초록색, 음수는 빨간색으로 표시
-        colors = ['#2E7D32' if v > 0 else '#C62828' for v in top_vals]
-
-        # subplots()로 새로운 그래프 생성
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # barh()는 가로 막대 그래프
-        # range(len(top_idx))는 y축 위치 (0, 1, 2, 3, 4)
-        ax.barh(range(len(top_idx)), top_vals, color=colors)
+    chunksize: 지정하면 CSV를 이 행 수만큼씩 나눠 읽는 청크 모드로 실행
+    unique: 청크 모드의 고유값 계산 방식 ('exact' 정확히 세기, 'hll' HyperLogLog 추정)
+    use_cache: 파싱한 CSV를 캐시에서 재사용하고, 최신 상태인 병합 파일은 다시 쓰지 않음
+    workers: 2 이상이면 데이터를 행 단위 조각으로 나눠 이 개수의 프로세스에서 집계
+             (0이면 CPU 코어 수만큼 사용)
+    compact: 읽은 데이터를 메모리를 적게 쓰는 타입(apply_compact_schema)으로 변환
+    profiler: 단계별 실행 시간과 메모리를 잴 StageProfiler (None이면 재지 않음)
+    plots: 'show'는 그래프를 저장하고 화면에 표시, 'headless'는 별도 프로세스에서 파일로만 저장
+           (값이 바뀌지 않았으면 건너뜀), 'none'은 그래프를 그리지 않음
+    '''
+    if profiler is None:
+        profiler = StageProfiler(enabled=False)
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    with profiler, FigureRenderer(plots) as renderer:
+        if workers > 1:
+            # 프로세스 풀은 한 번만 만들어서 모든 단계에서 함께 사용
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                run_analysis(chunksize, unique, use_cache, compact, profiler, renderer, executor, workers)
+        else:
+            run_analysis(chunksize, unique, use_cache, compact, profiler, renderer)
+
+
+def run_analysis(chunksize, unique, use_cache, compact, profiler, renderer, executor=None, workers=1):
+    '''main()의 각 단계를 실행한다. executor가 있으면 집계를 프로세스 풀에서 나눠 실행한다.'''
+    if chunksize:
+        # ========== 1~3단계 (청크 모드): 읽기, 구조 확인, 병합 ==========
+        # 청크마다 열 통계와 피처 기준 값(나이 중앙값, 범주 순서)을 누적하고 병합 파일에 바로 이어 씀
+        # 행은 남기지 않으므로 --unique hll이면 입력 크기와 관계없이 메모리 사용량이 일정함
+        with profiler.stage('load_merge') as stage:
+            is_fresh = use_cache and output_is_fresh(MERGED_FILE, INPUT_FILES.values())
+            output_path = None if is_fresh else MERGED_FILE
+            profiles, params = merge_in_chunks(INPUT_FILES, output_path, chunksize, unique=unique)
+            for name, profile in profiles.items():
+                print_profile_info(profile, name)
+            if is_fresh:
+                print(f'\n{MERGED_FILE} 파일이 이미 최신 상태라서 저장을 건너뜁니다.')
+            else:
+                if use_cache:
+                    record_output(MERGED_FILE, INPUT_FILES.values())
+                print(f'\n병합된 데이터를 {MERGED_FILE} 파일로 저장했습니다.')
+            stage.rows_in(profiles['Merged'].rows)
+            stage.rows_out(profiles['Merged'].rows)
+    else:
+        # ========== 1단계: CSV 파일 읽기 ==========
+        # read_csv()는 CSV 파일을 읽어서 표 형태의 데이터프레임으로 변환
+        # 캐시를 사용하면 바뀌지 않은 파일은 파싱 없이 이진 캐시에서 불러옴
+        with profiler.stage('load') as stage:
+            read_csv = read_csv_cached if use_cache else pd.read_csv
+            train_data = read_csv(INPUT_FILES['Train'])
+            test_data = read_csv(INPUT_FILES['Test'])
+            if compact:
+                # 메모리를 적게 쓰는 타입으로 변환하고 변환 전후 사용량 출력
+                train_data = compact_with_report(train_data, 'Train')
+                test_data = compact_with_report(test_data, 'Test')
+            stage.rows_out(train_data, test_data)
+
+        # ========== 2단계: 데이터 구조 확인 ==========
+        # 앞에서 정의한 함수를 호출하여 Train, Test 데이터 정보 출력
+        with profiler.stage('inspect') as stage:
+            stage.rows_in(train_data, test_data)
+            if executor is not None:
+                # 조각별 열 통계를 여러 프로세스에서 구한 뒤 합쳐서 출력
+                train_profile = profile_in_parallel(executor, train_data, workers)
+                test_profile = profile_in_parallel(executor, test_data, workers)
+                print_profile_info(train_profile, 'Train')
+                print_profile_info(test_profile, 'Test')
+            else:
+                print_basic_info(train_data, 'Train')
+                print_basic_info(test_data, 'Test')
+
+        # ========== 3단계: 데이터 병합 ==========
+        with profiler.stage('merge') as stage:
+            stage.rows_in(train_data, test_data)
+            # concat()은 여러 데이터프레임을 위아래로 연결
+            # ignore_index=True는 인덱스를 0부터 다시 매김
+            merged_data = pd.concat([train_data, test_data], ignore_index=True)
+            if compact:
+                # 두 데이터의 범주 목록이 달라 object로 바뀐 열을 다시 category로 변환
+                merged_data = apply_compact_schema(merged_data)
         
-        # y축에 항목 이름 표시
-        ax.set_yticks(range(len(top_idx)))
-        ax.set_yticklabels(top_idx)
+            # 병합된 데이터 정보 출력
+            if executor is not None:
+                # 병합 데이터의 열 통계는 Train, Test 통계를 합친 것과 같음
+                merged_profile = ColumnProfile()
+                merged_profile.merge(train_profile)
+                merged_profile.merge(test_profile)
+                print_profile_info(merged_profile, 'Merged')
+            else:
+                print_basic_info(merged_data, 'Merged')
         
-        ax.set_xlabel('상관계수', fontsize=12)
-        ax.set_title('Transported와 상관관계 상위 5개 항목', fontsize=14)
+            # 병합된 데이터를 CSV 파일로 저장
+            save_merged_data(merged_data, use_cache=use_cache)
+            stage.rows_out(merged_data)
+
+    # ========== 4단계: 분석용 피처 계산과 집계 ==========
+    # 연령대, 0/1 불리언, 범주 코드를 열 단위 연산으로 한 번만 계산하고
+    # 5단계(연령대별 인원 수)와 6단계(공분산 누적)에 필요한 집계를 함께 구함
+    with profiler.stage('features') as stage:
+        if chunksize:
+            # 입력 행: Transported 값이 있는 행 수 (청크 모드는 병합 데이터를 메모리에 두지 않음)
+            stage.rows_in(profiles['Merged'].valid_counts.get('Transported', 0))
+            # Train 파일을 청크 단위로 다시 읽으면서 집계만 누적
+            age_counts, accumulator = analyze_in_chunks(INPUT_FILES, chunksize, params, compact,
+                                                        executor, workers)
+        elif executor is not None:
+            stage.rows_in(merged_data)
+            # 조각별 집계를 여러 프로세스에서 구한 뒤 정확히 합침
+            age_counts, accumulator = analyze_in_parallel(executor, merged_data, workers)
+        else:
+            stage.rows_in(merged_data)
+            features = build_feature_frame(merged_data)
+            age_counts = count_age_groups(features)
+            # 상관계수 계산을 위한 숫자형 데이터
+            analysis_data = prepare_correlation_data(merged_data, features)
+            # 평균과 공분산을 누적하므로 데이터를 복사하지 않고 한 번만 훑음
+            accumulator = accumulate_covariance(analysis_data)
+        # 출력 행: 상관계수 계산에 사용된(결측값이 없는) 행 수
+        stage.rows_out(accumulator.count)
+
+    # ========== 5단계: 연령대별 Transported 그래프 ==========
+    with profiler.stage('plot_age') as stage:
+        stage.rows_in(int(age_counts.to_numpy().sum()))
+        # 연령 정보가 있는 인원이 한 명이라도 있으면 그래프 생성
+        if age_counts.to_numpy().sum() > 0:
+            # 연령대별 막대 그래프를 그려서 파일로 저장하고 화면에 표시
+            renderer.render(plot_age_transported, 'age_transported.png', age_counts)
+
+            # 연령대별 전송 비율 계산
+            print('\n연령대별 전송 비율(%)')
+            # sum(axis=1)은 각 행의 합계 계산 (연령대별 총 인원)
+            total_by_age = age_counts.sum(axis=1).replace(0, pd.NA)
+            # 전송된 사람 수 / 전체 인원 * 100 = 퍼센트
+            # round(2)는 소수점 둘째 자리까지 반올림
+            age_rate = (age_counts[1] / total_by_age * 100).round(2)
+            for age_group, rate in age_rate.items():
+                value = 'N/A' if pd.isna(rate) else f'{rate}%'
+                print(f'- {age_group}: {value}')
+        else:
+            print('\n연령 정보가 없어 연령대별 그래프를 생성할 수 없습니다.')
+
+    # ========== 6단계: 상관계수 분석 ==========
+    with profiler.stage('correlation') as stage:
+        stage.rows_in(accumulator.count)
+        print(f'\n상관계수 분석에 사용된 데이터 수: {accumulator.count}')
         
-        # axvline()은 수직선 그리기 (x=0 위치에 양수/음수 구분선)
-        ax.axvline(x=0, color='black', linestyle='-', linewidth=0.5)
+        if accumulator.count < 2:
+            print('\n상관계수 분석을 위한 유효한 숫자 데이터가 충분하지 않습니다.')
+            return
+
+        # 누적한 공분산으로 상관계수 행렬 계산 (-1 ~ 1 사이의 값)
+        corr_mat = accumulator.correlation()
+        # Transported 열만 추출하고, 자기 자신(Transported)은 제거
+        transported_corr = corr_mat['Transported'].drop('Transported')
+
+        # 절댓값 기준으로 내림차순 정렬 (큰 값부터)
+        # abs()는 절댓값, sort_values()는 정렬
+        transported_corr_sorted = transported_corr.reindex(transported_corr.abs().sort_values(ascending=False).index)
+
+        # 상관계수 출력
+        print('\nTransported와의 상관계수 (절댓값 기준 내림차순):')
+        for feature, value in transported_corr_sorted.items():
+            print(f'- {feature}: {value:.4f}')
+        stage.rows_out(transported_corr_sorted)
+
+    # ========== 7단계: 상위 5개 항목 시각화 ==========
+    with profiler.stage('plot_top') as stage:
+        # 상관계수 상위 5개 항목만 추출
+        top_idx = list(transported_corr_sorted.index[:5])
+        stage.rows_in(top_idx)
         
-        plt.tight_layout()
-        plt.savefig('correlation_top5.png', dpi=300)
-        plt.show()
+        if top_idx:
+            # 상위 5개의 상관계수 값
+            top_vals = [transported_corr[feat] for feat in top_idx]
+            # 가로 막대 그래프를 그려서 파일로 저장하고 화면에 표시
+            renderer.render(plot_top_correlations, 'correlation_top5.png', top_idx, top_vals)
 
-        # 가장 관련성이 높은 항목 출력
-        print(f'\n가장 관련성이 높은 항목: {top_idx[0]}')
-        print(f'상관계수: {transported_corr[top_idx[0]]:.4f}')
-    else:
-        print('\n상관계수를 계산할 항목이 없습니다.')
+            # 가장 관련성이 높은 항목 출력
+            print(f'\n가장 관련성이 높은 항목: {top_idx[0]}')
+            print(f'상관계수: {transported_corr[top_idx[0]]:.4f}')
+        else:
+            print('\n상관계수를 계산할 항목이 없습니다.')
 
 
 # 파이썬 프로그램의 시작점
 # 이 파일이 직접 실행될 때만 main() 함수가 실행됨
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Spaceship Titanic 데이터 분석')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='CSV를 이 행 수만큼씩 나눠 읽는 청크 모드로 실행')
+    parser.add_argument('--unique', choices=['exact', 'hll'], default='exact',
+                        help='청크 모드의 고유값 계산 방식 (hll: HyperLogLog 추정, 메모리 일정 / '
+                             'exact: 고유값을 모두 보관)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='CSV 파싱 캐시를 사용하지 않고 병합 파일도 항상 다시 저장')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='집계에 사용할 프로세스 수 (2 이상이면 병렬 실행, 0이면 CPU 코어 수)')
+    parser.add_argument('--compact', action='store_true',
+                        help='category/boolean/float32 타입과 Cabin, PassengerId 분리로 메모리 절약')
+    parser.add_argument('--plots', choices=PLOT_MODES, default='show',
+                        help='show: 그래프 표시, headless: 화면 없이 파일로만 저장 (값이 같으면 건너뜀), none: 그리지 않음')
+    parser.add_argument('--profile', nargs='?', const='', metavar='JSON',
+                        help='단계별 실행 시간, 메모리, 행 수를 출력 (파일 이름을 주면 JSON으로도 저장)')
+    parser.add_argument('--cprofile-dir', help='--profile과 함께 사용, 단계별 cProfile 결과(.prof)를 저장할 폴더')
+    args = parser.parse_args()
+    profiler = None
+    if args.profile is not None:
+        profiler = StageProfiler(cprofile_dir=args.cprofile_dir, report_path=args.profile or None)
+    main(chunksize=args.chunksize, unique=args.unique, use_cache=not args.no_cache,
+         workers=args.workers, compact=args.compact, profiler=profiler, plots=args.plots)
@@ -0,0 +1,110 @@
+'''p_main.py 단계별 성능 측정 (합성 데이터 벤치마크)
+
+census.csv와 같은 형식(억제 표시 'X', '-' 포함)의 합성 데이터를 원하는 행 수만큼 만들고,
+p_main.py의 각 단계를 따로 실행하면서 실행 시간(wall/CPU)과 최대 메모리를 잰다.
+결과는 JSON 파일로 저장하고, 이전 결과 파일과 비교할 수 있다.
+
+사용 예:
+    python bench.py --sizes 10k 1m
+    python bench.py --sizes 10k --compare bench_results/p_main_20260101_120000.json
+'''
+import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')  # 화면 없이 그래프를 그림 (plt.show()가 멈추지 않도록)
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# 4-1, 4-2가 함께 쓰는 모듈(common 폴더)을 import할 수 있도록 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
+
+import p_main
+from bench_common import measure, run_benchmark
+
+
+DATA_DIR = 'bench_data'
+
+YEARS = list(range(2010, 2025))
+GENDERS = ['계', '남자', '여자']
+AGES = ['합계', '15세미만', '15~19세', '20~24세', '25~29세', '30~34세', '35~39세', '40~44세',
+        '45~49세', '50~54세', '55~59세', '60~64세', '65~69세', '70~74세', '75~79세', '80~84세',
+        '85세이상', '15~64세', '65세이상']
+KEY_COLUMNS = ['시점', '성별', '연령별', '행정구역별(시군구)']
+COUNT_COLUMNS = ['일반가구원', '가구주', '가구주의 배우자', '자녀', '자녀의 배우자', '가구주의 부모',
+                 '배우자의 부모', '손자녀 그 배우자', '친손자녀·그 배우자', '외손자녀·그 배우자',
+                 '증손자녀·그 배우자', '조부모', '형제자매·그 배우자', '형제자매의 자녀·그 배우자',
+                 '부모의 형제자매·그 배우자', '기타 친·인척', '기타 동거인']
+# 억제 표시가 들어가지 않는 컬럼 (원본 파일에서 항상 숫자인 컬럼)
+NUMERIC_ONLY_COLUMNS = ['일반가구원', '가구주']
+
+
+def generate_census(rows, rng):
+    '''census.csv 형식의 합성 데이터를 만든다.
+
+    시점 × 성별 × 연령별 × 행정구역 조합을 rows행이 될 때까지 늘리고,
+    일부 값은 원본처럼 'X'(비밀 보호)나 '-'(해당 없음)로 억제
+    '''
+    combos = len(YEARS) * len(GENDERS) * len(AGES)
+    regions = [f'지역{i:05d}' for i in range(-(-rows // combos))]
+    # 행정구역 → 시점 → 성별 → 연령별 순서로 반복되는 조합을 만들고 rows행만 사용
+    index = pd.MultiIndex.from_product([regions, YEARS, GENDERS, AGES]).to_frame(index=False)[:rows]
+    data = {
+        '시점': index[1].astype(str),
+        '성별': index[2],
+        '연령별': index[3],
+        '행정구역별(시군구)': index[0],
+    }
+    for col in COUNT_COLUMNS:
+        values = pd.Series(rng.integers(0, 2_000_000, size=rows)).astype(str)
+        if col not in NUMERIC_ONLY_COLUMNS:
+            marker = rng.random(rows)
+            values = values.mask(marker < 0.13, 'X').mask((marker >= 0.13) & (marker < 0.2), '-')
+        data[col] = values
+    return pd.DataFrame(data)
+
+
+def prepare_data(rows, seed=0):
+    '''행 수에 맞는 합성 census CSV를 만들고(이미 있으면 재사용) 경로를 반환한다.'''
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f'census_{rows}_{seed}.csv')
+    if not os.path.exists(path):
+        rng = np.random.default_rng(seed)
+        generate_census(rows, rng).to_csv(path, index=False)
+    return path
+
+
+def plot_without_show(df):
+    # plot_gender_age_graph()의 plt.show()는 Agg 백엔드에서 바로 반환됨, 그래프는 닫아서 메모리 정리
+    p_main.plot_gender_age_graph(df)
+    plt.close('all')
+
+
+def run_stages(rows, trace_memory=True):
+    '''합성 데이터로 p_main.py의 각 단계를 순서대로 측정한다.'''
+    results = []
+    path = prepare_data(rows)
+    print(f'\n[{rows:,}행]')
+
+    def step(stage, func, *args, **kwargs):
+        return measure(results, rows, stage, func, *args, trace_memory=trace_memory, **kwargs)
+
+    df = step('load_csv_data', p_main.load_csv_data, path, use_cache=False)
+    df = step('filter_columns', p_main.filter_columns, df)
+    df = step('filter_by_year', p_main.filter_by_year, df, start_year=2015)
+    df_gender = step('filter_gender_data', p_main.filter_gender_data, df)
+    step('get_gender_statistics', p_main.get_gender_statistics, df_gender)
+    step('get_age_statistics', p_main.get_age_statistics, df_gender)
+    step('get_gender_age_statistics', p_main.get_gender_age_statistics, df_gender)
+    step('plot_gender_age_graph', plot_without_show, df_gender)
+    return results
+
+
+def main():
+    run_benchmark('p_main', run_stages)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""여러 census CSV 파일(시군구별, 공표 시점별 추출 파일)을 프로세스 풀에서 한꺼번에 처리하는 배치 실행기
+
+파일마다 p_main.py와 같은 필터와 통계를 적용하고, 파일별 결과를 더해서 합친 통계를 만든다.
+결과는 출력 폴더에 CSV로 저장하고, 파일별 처리 시간도 함께 기록한다.
+
+사용 예:
+    python census_batch.py extracts/                      # 폴더 안의 모든 *.csv
+    python census_batch.py 'extracts/*_2024.csv' --workers 8 --output batch_output
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import p_main
+from census_cube import CensusCube
+
+
+# 통계 이름과 합칠 때 사용할 구분 컬럼
+STAT_KEYS = {
+    'gender_stats': ['시점', '성별'],
+    'age_stats': ['연령별'],
+    'gender_age_stats': ['성별', '연령별'],
+}
+
+
+def find_files(patterns):
+    """폴더 또는 glob 패턴 목록에서 CSV 파일 목록을 만드는 함수 (중복 제거, 정렬)"""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, '*.csv'))
+        else:
+            matches = glob.glob(pattern)
+        files.extend(sorted(matches))
+    return list(dict.fromkeys(files))
+
+
+def process_file(file_path, start_year=2015, use_cache=True):
+    """파일 하나에 p_main.py와 같은 필터와 통계를 적용하는 함수 (프로세스 풀에서 실행)"""
+    start = time.perf_counter()
+    df = p_main.load_csv_data(file_path, use_cache=use_cache,
+                              usecols=[*p_main.ANALYSIS_COLUMNS, p_main.REGION_COLUMN])
+    rows = len(df)
+
+    cube = CensusCube.from_frame(df)
+    cube = p_main.filter_columns(cube)
+    cube = p_main.filter_by_year(cube, start_year=start_year)
+    cube = p_main.filter_gender_data(cube)
+
+    # 통계 함수가 출력하는 표는 파일마다 찍지 않고 버림
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = {
+            'gender_stats': p_main.get_gender_statistics(cube),
+            'age_stats': p_main.get_age_statistics(cube),
+            'gender_age_stats': p_main.get_gender_age_statistics(cube),
+        }
+    return {'file': file_path, 'rows': rows, 'seconds': time.perf_counter() - start, 'stats': stats}
+
+
+def combine_statistics(results):
+    """파일별 통계를 이어 붙이고, 같은 구분끼리 더해서 합친 통계를 만드는 함수
+
+    반환: {통계 이름: 합친 통계, 통계 이름_by_file: 파일 컬럼이 붙은 파일별 통계}
+    """
+    combined = {}
+    for name, keys in STAT_KEYS.items():
+        frames = [result['stats'][name].assign(파일=os.path.basename(result['file'])) for result in results]
+        by_file = pd.concat(frames, ignore_index=True)
+        combined[name] = by_file.groupby(keys, observed=True)['일반가구원'].sum().reset_index()
+        combined[f'{name}_by_file'] = by_file
+    return combined
+
+
+def run_batch(files, workers=None, output_dir='batch_output', start_year=2015, use_cache=True):
+    """파일 목록을 프로세스 풀에서 처리하고 합친 통계와 파일별 처리 시간을 저장하는 함수"""
+    batch_start = time.perf_counter()
+    results = []
+    failures = []
+
+    print(f'=== {len(files)}개 파일 처리 (프로세스 {workers or os.cpu_count()}개) ===')
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(process_file, path, start_year, use_cache): path for path in files}
+        # as_completed()는 먼저 끝난 작업부터 결과를 돌려줌
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except (OSError, ValueError, KeyError, pd.errors.ParserError) as error:
+                failures.append({'file': path, 'error': str(error)})
+                print(f'- {path}: 실패 ({error})')
+                continue
+            results.append(result)
+            print(f"- {path}: {result['rows']:,}행, {result['seconds']:.2f}초")
+
+    elapsed = time.perf_counter() - batch_start
+    if not results:
+        print('처리된 파일이 없습니다.')
+        return None
+
+    # 파일 순서를 입력 순서로 맞춰서 결과가 항상 같도록 함
+    order = {path: i for i, path in enumerate(files)}
+    results.sort(key=lambda result: order[result['file']])
+    combined = combine_statistics(results)
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, table in combined.items():
+        table.to_csv(os.path.join(output_dir, f'{name}.csv'), index=False, encoding='utf-8-sig')
+    timings = pd.DataFrame([{'file': r['file'], 'rows': r['rows'], 'seconds': round(r['seconds'], 4)}
+                            for r in results] + [{**f, 'rows': None, 'seconds': None} for f in failures])
+    timings.to_csv(os.path.join(output_dir, 'file_timings.csv'), index=False, encoding='utf-8-sig')
+
+    total_rows = sum(result['rows'] for result in results)
+    print()
+    print('=== 합친 남자 및 여자의 연도별 일반가구원 통계 ===')
+    print(combined['gender_stats'])
+    print()
+    print(f'성공 {len(results)}개, 실패 {len(failures)}개, 총 {total_rows:,}행, {elapsed:.2f}초 '
+          f'({len(results) / elapsed:.1f} 파일/초, {total_rows / elapsed:,.0f} 행/초)')
+    print(f'결과를 {output_dir} 폴더에 저장했습니다.')
+    return combined
+
+
+def main():
+    parser = argparse.ArgumentParser(description='여러 census CSV 파일 일괄 처리')
+    parser.add_argument('inputs', nargs='+', help='CSV 파일이 있는 폴더 또는 glob 패턴')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: CPU 코어 수)')
+    parser.add_argument('--output', default='batch_output', help='결과를 저장할 폴더')
+    parser.add_argument('--start-year', type=int, default=2015, help='이 연도 이후 데이터만 사용')
+    parser.add_argument('--no-cache', action='store_true', help='CSV 파싱 캐시를 사용하지 않음')
+    args = parser.parse_args()
+
+    files = find_files(args.inputs)
+    if not files:
+        print(f'CSV 파일을 찾을 수 없습니다: {args.inputs}')
+        return
+    run_batch(files, workers=args.workers, output_dir=args.output,
+              start_year=args.start_year, use_cache=not args.no_cache)
+
+
+if __name__ == '__main__':
+    main()
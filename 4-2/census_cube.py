@@ -0,0 +1,103 @@
+"""인구주택총조사 데이터를 다차원 배열(큐브)로 한 번만 집계해 두는 모듈
+
+시점 × 성별 × 연령별 × 행정구역 × 가구원 항목(일반가구원, 가구주 등) 축을 가진
+numpy 배열을 만들고, 통계는 배열 인덱싱과 축 합계로 계산한다.
+"""
+import numpy as np
+import pandas as pd
+
+
+# 큐브의 구분 축 (이 컬럼을 제외한 나머지 숫자 컬럼이 항목 축이 됨)
+DIMENSIONS = ['시점', '성별', '연령별', '행정구역별(시군구)']
+
+
+class CensusCube:
+    """구분 축별 라벨 인덱스와 합계 배열을 가진 인구 통계 큐브
+
+    values: 구분 축 + 항목 축 모양의 정수 배열 (억제 표시 등 결측값은 0으로 더함)
+    present: 구분 축 모양의 불리언 배열 (원본에 해당 조합의 행이 있었는지)
+    labels: {축 이름: 라벨 pd.Index}
+    measures: 항목 이름 pd.Index
+    """
+
+    def __init__(self, values, present, labels, measures):
+        self.values = values
+        self.present = present
+        self.labels = labels
+        self.measures = pd.Index(measures)
+        self.dims = list(labels)
+
+    @classmethod
+    def from_frame(cls, df, dimensions=DIMENSIONS):
+        """DataFrame을 한 번 훑어서 큐브를 만드는 함수
+
+        dimensions 중 df에 있는 컬럼이 구분 축, 나머지 컬럼은 모두 숫자 항목으로 사용
+        구분 값이 없는 행은 groupby와 같이 제외
+        """
+        dims = [d for d in dimensions if d in df.columns]
+        measures = [c for c in df.columns if c not in dims]
+
+        codes = []
+        labels = {}
+        for dim in dims:
+            # factorize(sort=True): 정렬된 고유값(축 라벨)과 각 행의 라벨 위치(코드)
+            code, uniques = pd.factorize(df[dim], sort=True)
+            codes.append(code)
+            labels[dim] = pd.Index(np.asarray(uniques), name=dim)
+
+        shape = tuple(len(labels[dim]) for dim in dims)
+        size = int(np.prod(shape))
+        valid = np.all([code >= 0 for code in codes], axis=0)
+        # 여러 축의 위치를 1차원 칸 번호로 바꿈
+        flat = np.ravel_multi_index([code[valid] for code in codes], shape)
+
+        values = np.zeros((size, len(measures)), dtype=np.int64)
+        for i, measure in enumerate(measures):
+            column = df[measure].to_numpy(dtype=np.float64, na_value=0)[valid]
+            # bincount(weights=)는 같은 칸 번호끼리 값을 더함
+            values[:, i] = np.rint(np.bincount(flat, weights=column, minlength=size))
+        present = np.bincount(flat, minlength=size) > 0
+
+        return cls(values.reshape(shape + (len(measures),)), present.reshape(shape), labels, measures)
+
+    def _take(self, dim, positions):
+        axis = self.dims.index(dim)
+        labels = dict(self.labels)
+        labels[dim] = self.labels[dim][positions]
+        return CensusCube(np.take(self.values, positions, axis=axis),
+                          np.take(self.present, positions, axis=axis), labels, self.measures)
+
+    def select(self, dim, labels):
+        """dim 축에서 labels에 해당하는 칸만 남긴 큐브를 반환"""
+        return self._take(dim, np.flatnonzero(self.labels[dim].isin(labels)))
+
+    def exclude(self, dim, labels):
+        """dim 축에서 labels에 해당하는 칸을 뺀 큐브를 반환"""
+        return self._take(dim, np.flatnonzero(~self.labels[dim].isin(labels)))
+
+    def select_measures(self, measures):
+        """항목 축에서 measures만 남긴 큐브를 반환"""
+        positions = self.measures.get_indexer(measures)
+        return CensusCube(self.values[..., positions], self.present, self.labels, self.measures[positions])
+
+    def total(self, by, measure='일반가구원'):
+        """by 축별 measure 합계를 Series로 반환 (groupby(by)[measure].sum()과 같은 결과)
+
+        나머지 축은 모두 더하고, 원본에 행이 있었던 조합만 남김
+        """
+        data = self.values[..., self.measures.get_loc(measure)]
+        other_axes = tuple(i for i, dim in enumerate(self.dims) if dim not in by)
+        sums = data.sum(axis=other_axes)
+        present = self.present.any(axis=other_axes)
+
+        # 합계 배열의 축 순서(self.dims 순서)를 by 순서로 맞춤
+        kept = [dim for dim in self.dims if dim in by]
+        order = [kept.index(dim) for dim in by]
+        sums = np.transpose(sums, order)
+        present = np.transpose(present, order)
+
+        index = pd.MultiIndex.from_product([self.labels[dim] for dim in by], names=by)
+        result = pd.Series(sums.ravel(), index=index, name=measure)[present.ravel()]
+        if len(by) == 1:
+            result.index = result.index.get_level_values(0)
+        return result
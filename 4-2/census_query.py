@@ -0,0 +1,94 @@
+"""CSV를 바로 읽지 않고 컬럼 선택과 행 조건을 모아 두었다가 한 번에 읽는 지연(lazy) 쿼리
+
+collect()를 호출할 때 필요한 컬럼만 usecols로 읽고(projection pushdown),
+청크마다 행 조건을 바로 적용해서(predicate pushdown) 조건에 맞지 않는 행은 메모리에 남기지 않는다.
+"""
+import numpy as np
+import pandas as pd
+
+
+# 행 조건에 사용할 수 있는 비교 연산
+OPERATORS = {
+    '==': lambda series, value: series == value,
+    '!=': lambda series, value: series != value,
+    '>=': lambda series, value: series >= value,
+    '>': lambda series, value: series > value,
+    '<=': lambda series, value: series <= value,
+    '<': lambda series, value: series < value,
+    'in': lambda series, value: series.isin(value),
+    'not in': lambda series, value: ~series.isin(value),
+}
+
+
+class CsvScan:
+    """실행을 미뤄 둔 CSV 읽기 계획
+
+    file_path: 읽을 CSV 파일
+    chunksize: 한 번에 읽을 행 수
+    columns: 결과에 남길 컬럼 (None이면 전체)
+    predicates: (컬럼, 연산, 값) 행 조건 목록 (모두 만족하는 행만 남김)
+    read_kwargs: pd.read_csv()에 그대로 넘길 옵션 (encoding, dtype, na_values 등)
+    """
+
+    def __init__(self, file_path, chunksize=100_000, columns=None, predicates=(), **read_kwargs):
+        self.file_path = file_path
+        self.chunksize = chunksize
+        self.columns = None if columns is None else list(columns)
+        self.predicates = tuple(predicates)
+        self.read_kwargs = read_kwargs
+        self._result = None
+
+    def _copy(self, columns, predicates):
+        return CsvScan(self.file_path, self.chunksize, columns, predicates, **self.read_kwargs)
+
+    def select(self, columns):
+        """결과에 남길 컬럼을 정한 새 계획을 반환 (이미 선택한 컬럼이 있으면 그 안에서 선택)"""
+        if self.columns is not None:
+            missing = [c for c in columns if c not in self.columns]
+            if missing:
+                raise KeyError(f'선택되지 않은 컬럼입니다: {missing}')
+        return self._copy(columns, self.predicates)
+
+    def filter(self, column, op, value):
+        """행 조건을 추가한 새 계획을 반환 (예: filter('시점', '>=', 2015))"""
+        if op not in OPERATORS:
+            raise ValueError(f'지원하지 않는 연산입니다: {op}')
+        return self._copy(self.columns, self.predicates + ((column, op, value),))
+
+    def explain(self):
+        """실행 계획을 문자열로 반환"""
+        columns = '전체' if self.columns is None else ', '.join(self.columns)
+        conditions = ' AND '.join(f'{col} {op} {value!r}' for col, op, value in self.predicates) or '없음'
+        return f'CSV 읽기: {self.file_path} (청크 {self.chunksize:,}행)\n- 컬럼: {columns}\n- 조건: {conditions}'
+
+    def collect(self):
+        """계획을 실행해서 DataFrame을 반환 (한 번 실행한 결과는 재사용)"""
+        if self._result is not None:
+            return self._result
+
+        usecols = None
+        if self.columns is not None:
+            # 결과 컬럼과 조건에 쓰는 컬럼만 읽음 (dict.fromkeys로 순서를 유지하며 중복 제거)
+            usecols = list(dict.fromkeys([*self.columns, *(col for col, _, _ in self.predicates)]))
+
+        parts = []
+        for chunk in pd.read_csv(self.file_path, usecols=usecols, chunksize=self.chunksize, **self.read_kwargs):
+            mask = np.ones(len(chunk), dtype=bool)
+            for col, op, value in self.predicates:
+                mask &= OPERATORS[op](chunk[col], value).to_numpy(dtype=bool, na_value=False)
+            part = chunk[mask]
+            parts.append(part if self.columns is None else part[self.columns])
+
+        if not parts:
+            # 헤더만 있는 파일은 빈 DataFrame
+            empty = pd.read_csv(self.file_path, usecols=usecols, nrows=0, **self.read_kwargs)
+            parts.append(empty if self.columns is None else empty[self.columns])
+
+        result = pd.concat(parts, ignore_index=True)
+        # 청크마다 범주 목록이 달라 object로 바뀐 category 컬럼을 다시 category로 변환
+        categories = [col for col in result.columns
+                      if parts[0][col].dtype == 'category' and result[col].dtype != 'category']
+        if categories:
+            result = result.astype({col: 'category' for col in categories})
+        self._result = result
+        return result
@@ -0,0 +1,105 @@
+'''census_cube.py(큐브)와 census_query.py(지연 쿼리)로 계산한 통계가
+DataFrame groupby로 계산한 p_main.py의 통계와 같은지 확인하는 스크립트
+
+억제 표시('X', '-')가 들어간 합성 census 데이터를 만들어서, 같은 필터와 통계를
+groupby / 큐브 / 지연 쿼리 / 지연 쿼리 + 큐브 네 가지 방식으로 계산해 비교한다.
+
+사용 예:
+    python check_cube.py
+    python check_cube.py --rows 200000
+'''
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import p_main
+from bench import generate_census
+from census_cube import CensusCube
+
+
+STATISTICS = {
+    'gender_stats': p_main.get_gender_statistics,
+    'age_stats': p_main.get_age_statistics,
+    'gender_age_stats': p_main.get_gender_age_statistics,
+}
+
+
+def write_census(path, rows, seed=0):
+    '''억제 표시가 들어간 합성 census CSV를 만든다.
+
+    bench.py의 데이터는 일반가구원에 억제 표시가 없으므로, 집계 대상인 일반가구원에도
+    일부 'X', '-'를 넣어서 결측값 처리까지 비교되게 함
+    '''
+    rng = np.random.default_rng(seed)
+    df = generate_census(rows, rng)
+    marker = rng.random(len(df))
+    df['일반가구원'] = df['일반가구원'].mask(marker < 0.05, 'X').mask((marker >= 0.05) & (marker < 0.08), '-')
+    df.to_csv(path, index=False)
+
+
+def filtered(df):
+    df = p_main.filter_columns(df)
+    df = p_main.filter_by_year(df, start_year=2015)
+    return p_main.filter_gender_data(df)
+
+
+def compute(path, method):
+    '''method 방식으로 필터와 통계를 계산해서 {통계 이름: 결과}와 그래프용 연령별 합계를 반환한다.'''
+    if method in ('lazy', 'lazy+cube'):
+        df = filtered(p_main.scan_census(path, chunksize=10_000)).collect()
+        if method == 'lazy+cube':
+            df = CensusCube.from_frame(df)
+    else:
+        if method == 'cube':
+            # p_main.main()과 같이 모든 항목 컬럼으로 큐브를 만듦
+            df = CensusCube.from_frame(p_main.load_csv_data(path, use_cache=False))
+        else:
+            df = p_main.load_csv_data(path, use_cache=False, usecols=[*p_main.ANALYSIS_COLUMNS, p_main.REGION_COLUMN])
+        df = filtered(df)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = {name: func(df) for name, func in STATISTICS.items()}
+    stats['gender_age_series'] = pd.concat(p_main.get_gender_age_series(df), axis=1, keys=['남자', '여자'])
+    return stats
+
+
+def normalize(value):
+    # 큐브와 groupby는 범주 타입, 정수 타입(int64/Int64)이 다를 수 있으므로 값만 비교
+    frame = value.reset_index() if isinstance(value.index, pd.MultiIndex) or value.index.name else value
+    frame = frame.astype({col: str for col in frame.columns if not pd.api.types.is_numeric_dtype(frame[col])})
+    return frame.astype({col: 'int64' for col in frame.columns if pd.api.types.is_integer_dtype(frame[col])})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='큐브/지연 쿼리 통계와 groupby 통계 비교')
+    parser.add_argument('--rows', type=int, default=50_000, help='합성 데이터 행 수')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'census.csv')
+        write_census(path, args.rows)
+        expected = compute(path, 'groupby')
+        print(f'=== 합성 census 데이터 {args.rows:,}행 (groupby 결과와 비교) ===')
+        failed = 0
+        for method in ['cube', 'lazy', 'lazy+cube']:
+            actual = compute(path, method)
+            for name, value in expected.items():
+                try:
+                    pd.testing.assert_frame_equal(normalize(actual[name]), normalize(value))
+                    result = 'OK'
+                except AssertionError as error:
+                    failed += 1
+                    result = f'실패\n{error}'
+                print(f'- {method:<10} {name:<18} {result}')
+    if failed:
+        raise SystemExit(f'{failed}개 항목이 다릅니다.')
+    print('모든 항목이 같습니다.')
+
+
+if __name__ == '__main__':
+    main()
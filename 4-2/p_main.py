@@ -1,31 +1,108 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import argparse
+import codecs
+import os
 import platform
+import sys
+from collections import defaultdict
+
+import pandas as pd
+
+# 4-1, 4-2가 함께 쓰는 모듈(common 폴더)을 import할 수 있도록 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
+
+from census_cube import CensusCube
+from census_query import CsvScan
+from csv_cache import load_cached
+from figure_render import PLOT_MODES, FigureRenderer, load_pyplot
+from stage_profiler import StageProfiler
+
 
+# 분석에 필요한 컬럼
+ANALYSIS_COLUMNS = ['시점', '성별', '연령별', '일반가구원']
+REGION_COLUMN = '행정구역별(시군구)'
 
-def load_csv_data(file_path):
-    """CSV 파일을 DataFrame으로 읽어들이는 함수"""
+# 구분 컬럼의 타입 (나머지 숫자 컬럼은 결측값을 허용하는 정수 Int64)
+KEY_DTYPES = {'시점': 'int64', '성별': 'category', '연령별': 'category', '행정구역별(시군구)': 'category'}
+COUNT_DTYPE = 'Int64'
+
+# 통계표의 억제 표시 (X: 비밀보호, -: 해당 없음) → 결측값으로 읽음
+SUPPRESSION_MARKERS = ['X', '-']
+
+
+def detect_encoding(file_path, sample_size=1 << 16):
+    """파일 앞부분 바이트만 읽어서 인코딩(utf-8-sig, utf-8, cp949)을 판별하는 함수"""
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_size)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
     try:
-        df = pd.read_csv(file_path, encoding='utf-8')
+        # final=False: 샘플 끝에서 잘린 멀티바이트 문자는 오류로 보지 않음
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
     except UnicodeDecodeError:
-        df = pd.read_csv(file_path, encoding='cp949')
+        return 'cp949'
+
+
+def load_csv_data(file_path, use_cache=True, usecols=None):
+    """CSV 파일을 DataFrame으로 읽어들이는 함수
+
+    인코딩은 앞부분 바이트로 한 번만 판별하고, 파일은 한 번만 파싱
+    'X', '-' 억제 표시는 결측값으로, 숫자 컬럼은 Int64, 시점은 정수로 읽음
+    usecols: 읽을 컬럼 목록 (없으면 전체)
+    use_cache가 True이면 파싱한 결과를 캐시해 두고, 파일이 그대로면 캐시에서 불러옴
+    """
+    if use_cache:
+        # 타입과 억제 표시도 캐시 키에 넣어서, 읽는 방식을 바꾸면 예전 캐시를 쓰지 않게 함
+        options = {'usecols': usecols, 'dtype': KEY_DTYPES, 'default_dtype': COUNT_DTYPE,
+                   'na_values': SUPPRESSION_MARKERS}
+        return load_cached(file_path, lambda path: load_csv_data(path, use_cache=False, usecols=usecols),
+                           tag='census_typed', options=options)
+
+    # defaultdict: KEY_DTYPES에 없는 컬럼은 모두 Int64로 읽음
+    dtypes = defaultdict(lambda: COUNT_DTYPE, KEY_DTYPES)
+    df = pd.read_csv(file_path, encoding=detect_encoding(file_path), usecols=usecols,
+                     dtype=dtypes, na_values=SUPPRESSION_MARKERS)
     
     return df
 
 
+def scan_census(file_path, chunksize=100_000):
+    """CSV를 바로 읽지 않는 지연 쿼리(CsvScan)를 만드는 함수
+
+    load_csv_data와 같은 인코딩 판별, 타입, 억제 표시 처리로 읽고,
+    filter_* 함수로 추가한 컬럼 선택과 행 조건은 collect() 할 때 읽기 단계에서 적용
+    """
+    dtypes = defaultdict(lambda: COUNT_DTYPE, KEY_DTYPES)
+    return CsvScan(file_path, chunksize=chunksize, encoding=detect_encoding(file_path),
+                   dtype=dtypes, na_values=SUPPRESSION_MARKERS)
+
+
 def filter_columns(df):
-    """일반가구원 관련 컬럼만 남기고 나머지 삭제"""
+    """일반가구원 관련 컬럼만 남기고 나머지 삭제
+
+    df: DataFrame, CensusCube 또는 CsvScan (필터 함수는 모두 같음)
+    CsvScan이면 바로 실행하지 않고 컬럼 선택만 계획에 추가
+    """
+    if isinstance(df, CsvScan):
+        return df.select(ANALYSIS_COLUMNS)
+    if isinstance(df, CensusCube):
+        # 큐브는 항목 축에서 일반가구원만 남김 (구분 축은 그대로)
+        return df.select_measures([c for c in ANALYSIS_COLUMNS if c in df.measures])
+
     # 분석에 필요한 컬럼만 유지
-    columns_to_keep = ['시점', '성별', '연령별', '일반가구원']
-    df_filtered = df[columns_to_keep]
+    df_filtered = df[ANALYSIS_COLUMNS]
     
     return df_filtered
 
 
 def filter_by_year(df, start_year=2015):
-    """2015년 이후 데이터만 필터링"""
-    # 시점 컬럼을 정수로 변환
-    df['시점'] = df['시점'].astype(int)
+    """2015년 이후 데이터만 필터링 (시점은 load_csv_data에서 정수로 읽음)"""
+    if isinstance(df, CsvScan):
+        return df.filter('시점', '>=', start_year)
+    if isinstance(df, CensusCube):
+        years = df.labels['시점']
+        return df.select('시점', years[years >= start_year])
+
     df_filtered = df[df['시점'] >= start_year]
     
     return df_filtered
@@ -33,6 +110,11 @@ def filter_by_year(df, start_year=2015):
 
 def filter_gender_data(df):
     """남자와 여자 데이터만 필터링 (계 제외)"""
+    if isinstance(df, CsvScan):
+        return df.filter('성별', 'in', ['남자', '여자'])
+    if isinstance(df, CensusCube):
+        return df.select('성별', ['남자', '여자'])
+
     df_filtered = df[df['성별'].isin(['남자', '여자'])]
     
     return df_filtered
@@ -40,8 +122,11 @@ def filter_gender_data(df):
 
 def get_gender_statistics(df):
     """남자 및 여자의 연도별 일반가구원 데이터 통계"""
-    # 성별, 연도별 그룹화
-    gender_stats = df.groupby(['시점', '성별'])['일반가구원'].sum().reset_index()
+    # 성별, 연도별 그룹화 (큐브는 나머지 축의 합계)
+    if isinstance(df, CensusCube):
+        gender_stats = df.total(['시점', '성별']).reset_index()
+    else:
+        gender_stats = df.groupby(['시점', '성별'], observed=True)['일반가구원'].sum().reset_index()
     
     print('=== 남자 및 여자의 연도별 일반가구원 통계 ===')
     print(gender_stats)
@@ -52,11 +137,14 @@ def get_gender_statistics(df):
 
 def get_age_statistics(df):
     """연령별 일반가구원 데이터 통계"""
-    # '합계'를 제외한 연령별 데이터
-    df_age = df[df['연령별'] != '합계']
-    
-    # 연령별 그룹화
-    age_stats = df_age.groupby('연령별')['일반가구원'].sum().reset_index()
+    if isinstance(df, CensusCube):
+        age_stats = df.exclude('연령별', ['합계']).total(['연령별']).reset_index()
+    else:
+        # '합계'를 제외한 연령별 데이터
+        df_age = df[df['연령별'] != '합계']
+        
+        # 연령별 그룹화
+        age_stats = df_age.groupby('연령별', observed=True)['일반가구원'].sum().reset_index()
     
     print('=== 연령별 일반가구원 통계 ===')
     print(age_stats)
@@ -67,11 +155,14 @@ def get_age_statistics(df):
 
 def get_gender_age_statistics(df):
     """남자 및 여자의 연령별 일반가구원 데이터 통계"""
-    # '합계'를 제외한 데이터
-    df_filtered = df[df['연령별'] != '합계']
-    
-    # 성별, 연령별 그룹화
-    gender_age_stats = df_filtered.groupby(['성별', '연령별'])['일반가구원'].sum().reset_index()
+    if isinstance(df, CensusCube):
+        gender_age_stats = df.exclude('연령별', ['합계']).total(['성별', '연령별']).reset_index()
+    else:
+        # '합계'를 제외한 데이터
+        df_filtered = df[df['연령별'] != '합계']
+        
+        # 성별, 연령별 그룹화
+        gender_age_stats = df_filtered.groupby(['성별', '연령별'], observed=True)['일반가구원'].sum().reset_index()
     
     print('=== 남자 및 여자의 연령별 일반가구원 통계 ===')
     print(gender_age_stats)
@@ -80,8 +171,27 @@ def get_gender_age_statistics(df):
     return gender_age_stats
 
 
-def plot_gender_age_graph(df):
-    """남자 및 여자의 연령별 일반가구원 데이터를 꺾은선 그래프로 표현"""
+def get_gender_age_series(df):
+    """그래프에 그릴 남자, 여자의 연령별 일반가구원 합계를 반환"""
+    # '합계', '15~64세' 등 집계 구간 제외
+    exclude_ages = ['합계', '15~64세', '15세미만']
+    if isinstance(df, CensusCube):
+        cube = df.exclude('연령별', exclude_ages)
+        male_data = cube.select('성별', ['남자']).total(['연령별'])
+        female_data = cube.select('성별', ['여자']).total(['연령별'])
+    else:
+        df_filtered = df[~df['연령별'].isin(exclude_ages)]
+        
+        # 성별로 데이터 분리
+        male_data = df_filtered[df_filtered['성별'] == '남자'].groupby('연령별', observed=True)['일반가구원'].sum()
+        female_data = df_filtered[df_filtered['성별'] == '여자'].groupby('연령별', observed=True)['일반가구원'].sum()
+    return male_data, female_data
+
+
+def draw_gender_age_graph(male_data, female_data, path=None, show=True):
+    """연령별 합계를 꺾은선 그래프로 그림 (path가 있으면 파일로 저장, show=False이면 표시하지 않고 닫음)"""
+    # matplotlib은 그래프를 그릴 때 처음 import
+    plt = load_pyplot()
     # 한글 폰트 설정
     if platform.system() == 'Darwin':
         plt.rc('font', family='AppleGothic')
@@ -90,14 +200,6 @@ def plot_gender_age_graph(df):
     
     plt.rc('axes', unicode_minus=False)
     
-    # '합계', '15~64세' 등 집계 구간 제외
-    exclude_ages = ['합계', '15~64세', '15세미만']
-    df_filtered = df[~df['연령별'].isin(exclude_ages)]
-    
-    # 성별로 데이터 분리
-    male_data = df_filtered[df_filtered['성별'] == '남자'].groupby('연령별')['일반가구원'].sum()
-    female_data = df_filtered[df_filtered['성별'] == '여자'].groupby('연령별')['일반가구원'].sum()
-    
     # 그래프 설정
     fig, ax = plt.subplots(figsize=(14, 7))
     ax.plot(male_data.index, male_data.values, marker='o', label='남자', linewidth=2)
@@ -116,36 +218,124 @@ def plot_gender_age_graph(df):
     ax.grid(True, alpha=0.3)
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.show()
+    if path:
+        plt.savefig(path)
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 
-def main():
-    """메인 실행 함수"""
-    # 1. CSV 파일 읽기
-    file_path = 'census.csv'
-    df = load_csv_data(file_path)
-    
-    # 2. 일반가구원 컬럼만 남기기
-    df = filter_columns(df)
-    
-    # 3. 2015년 이후 데이터 필터링
-    df = filter_by_year(df, start_year=2015)
-    
-    # 4. 남자와 여자 데이터만 필터링
-    df_gender = filter_gender_data(df)
-    
-    # 5. 남자 및 여자의 연도별 통계
-    gender_stats = get_gender_statistics(df_gender)
-    
-    # 6. 연령별 통계
-    age_stats = get_age_statistics(df_gender)
-    
-    # 7. 남자 및 여자의 연령별 통계
-    gender_age_stats = get_gender_age_statistics(df_gender)
-    
-    # 8. 꺾은선 그래프 출력
-    plot_gender_age_graph(df_gender)
+def plot_gender_age_graph(df):
+    """남자 및 여자의 연령별 일반가구원 데이터를 꺾은선 그래프로 표현"""
+    draw_gender_age_graph(*get_gender_age_series(df))
+
+
+def main(use_cache=True, use_cube=True, lazy=False, chunksize=100_000, profiler=None, plots='show'):
+    """메인 실행 함수
+
+    use_cube: True이면 데이터를 큐브로 한 번만 집계하고 이후 통계는 배열 합계로 계산
+    lazy: True이면 2~4단계 필터를 계획으로만 모았다가, 통계 직전에 청크 단위로 읽으면서
+          필요한 컬럼과 조건에 맞는 행만 남김 (파싱 캐시는 사용하지 않음)
+    chunksize: lazy 모드에서 한 번에 읽을 행 수
+    profiler: 단계별 실행 시간과 메모리를 잴 StageProfiler (None이면 재지 않음)
+    plots: 'show'는 그래프를 화면에 표시, 'headless'는 별도 프로세스에서 gender_age_graph.png로만 저장
+           (값이 바뀌지 않았으면 건너뜀), 'none'은 그래프를 그리지 않음
+    """
+    if profiler is None:
+        profiler = StageProfiler(enabled=False)
+
+    with profiler, FigureRenderer(plots) as renderer:
+        # 1. CSV 파일 읽기
+        file_path = 'census.csv'
+        with profiler.stage('load') as stage:
+            if lazy:
+                # 읽을 파일만 정해 두고 실제 읽기는 미룸
+                df = scan_census(file_path, chunksize=chunksize)
+            else:
+                if use_cube:
+                    # 큐브는 모든 가구원 항목(가구주, 자녀 등)을 담아서, 다른 항목이나 지역별 집계도
+                    # 같은 큐브에서 바로 계산할 수 있게 함
+                    df = load_csv_data(file_path, use_cache=use_cache)
+                    stage.rows_out(df)
+                    # 시점 × 성별 × 연령별 × 행정구역 × 항목 큐브로 한 번만 집계
+                    df = CensusCube.from_frame(df)
+                else:
+                    df = load_csv_data(file_path, use_cache=use_cache, usecols=[*ANALYSIS_COLUMNS, REGION_COLUMN])
+                    stage.rows_out(df)
+        
+        # 2. 일반가구원 컬럼만 남기기
+        with profiler.stage('filter_columns') as stage:
+            stage.rows_in(df)
+            df = filter_columns(df)
+            stage.rows_out(df)
+        
+        # 3. 2015년 이후 데이터 필터링
+        with profiler.stage('filter_year') as stage:
+            stage.rows_in(df)
+            df = filter_by_year(df, start_year=2015)
+            stage.rows_out(df)
+        
+        # 4. 남자와 여자 데이터만 필터링
+        with profiler.stage('filter_gender') as stage:
+            stage.rows_in(df)
+            df_gender = filter_gender_data(df)
+            stage.rows_out(df_gender)
+
+        if lazy:
+            with profiler.stage('collect') as stage:
+                # 모아 둔 컬럼 선택과 조건으로 한 번에 읽기
+                print(df_gender.explain())
+                print()
+                df_gender = df_gender.collect()
+                stage.rows_out(df_gender)
+                if use_cube:
+                    df_gender = CensusCube.from_frame(df_gender)
+        
+        # 5. 남자 및 여자의 연도별 통계
+        with profiler.stage('gender_stats') as stage:
+            stage.rows_in(df_gender)
+            gender_stats = get_gender_statistics(df_gender)
+            stage.rows_out(gender_stats)
+        
+        # 6. 연령별 통계
+        with profiler.stage('age_stats') as stage:
+            stage.rows_in(df_gender)
+            age_stats = get_age_statistics(df_gender)
+            stage.rows_out(age_stats)
+        
+        # 7. 남자 및 여자의 연령별 통계
+        with profiler.stage('gender_age_stats') as stage:
+            stage.rows_in(df_gender)
+            gender_age_stats = get_gender_age_statistics(df_gender)
+            stage.rows_out(gender_age_stats)
+        
+        # 8. 꺾은선 그래프 출력
+        if plots != 'none':
+            with profiler.stage('plot') as stage:
+                stage.rows_in(df_gender)
+                male_data, female_data = get_gender_age_series(df_gender)
+                # show 모드는 기존처럼 화면에만 표시 (파일로 저장하지 않음)
+                path = 'gender_age_graph.png' if plots == 'headless' else None
+                renderer.render(draw_gender_age_graph, path, male_data, female_data)
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='인구주택총조사 일반가구원 통계')
+    parser.add_argument('--no-cache', action='store_true', help='CSV 파싱 캐시를 사용하지 않음')
+    parser.add_argument('--no-cube', action='store_true',
+                        help='큐브 대신 DataFrame groupby로 통계 계산')
+    parser.add_argument('--lazy', action='store_true',
+                        help='필터 조건을 모았다가 필요한 컬럼과 행만 청크 단위로 읽음')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='lazy 모드에서 한 번에 읽을 행 수')
+    parser.add_argument('--plots', choices=PLOT_MODES, default='show',
+                        help='show: 그래프 표시, headless: 화면 없이 파일로만 저장 (값이 같으면 건너뜀), none: 그리지 않음')
+    parser.add_argument('--profile', nargs='?', const='', metavar='JSON',
+                        help='단계별 실행 시간, 메모리, 행 수를 출력 (파일 이름을 주면 JSON으로도 저장)')
+    parser.add_argument('--cprofile-dir', help='--profile과 함께 사용, 단계별 cProfile 결과(.prof)를 저장할 폴더')
+    args = parser.parse_args()
+    profiler = None
+    if args.profile is not None:
+        profiler = StageProfiler(cprofile_dir=args.cprofile_dir, report_path=args.profile or None)
+    main(use_cache=not args.no_cache, use_cube=not args.no_cube, lazy=args.lazy, chunksize=args.chunksize,
+         profiler=profiler, plots=args.plots)
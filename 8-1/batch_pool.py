@@ -0,0 +1,15 @@
+"""video_batch.py, img_batch.py가 함께 쓰는 OpenCV 작업용 프로세스 풀"""
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+
+def init_worker():
+    """작업 프로세스 초기화 함수"""
+    # 프로세스마다 OpenCV 내부 스레드를 여러 개 쓰면 코어 수보다 스레드가 많아져 오히려 느려짐
+    cv2.setNumThreads(1)
+
+
+def process_pool(workers=None):
+    """OpenCV 내부 스레드를 1개로 제한한 프로세스 풀을 만드는 함수 (workers가 None이면 CPU 코어 수)"""
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
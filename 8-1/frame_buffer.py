@@ -0,0 +1,60 @@
+"""최근 몇 초의 프레임을 고정된 메모리에 계속 보관하는 링 버퍼
+
+녹화를 시작하기 전 장면(pre-roll)을 함께 저장하는 데 사용한다.
+"""
+import numpy as np
+
+
+# 버퍼 하나의 최대 크기 (고해상도/고FPS 동영상에서 수 GB를 할당하지 않도록 제한)
+MAX_BUFFER_BYTES = 256 * 1024 ** 2
+
+
+class FrameRingBuffer:
+    """최근 프레임을 미리 할당한 하나의 numpy 배열에 돌려 가며 저장하는 버퍼
+
+    capacity: 보관할 최대 프레임 수 (가득 차면 가장 오래된 프레임을 덮어씀)
+    frame_shape: 프레임 모양 (높이, 너비, 채널)
+    메모리 사용량은 capacity × 프레임 크기로 처음에 정해지고 더 늘지 않음
+    """
+
+    def __init__(self, capacity, frame_shape, dtype=np.uint8):
+        self.capacity = capacity
+        self.frames = np.empty((capacity, *frame_shape), dtype=dtype)
+        self.start = 0  # 가장 오래된 프레임의 위치
+        self.size = 0
+
+    @classmethod
+    def for_duration(cls, seconds, fps, frame_shape, dtype=np.uint8, max_bytes=MAX_BUFFER_BYTES):
+        """seconds초 분량의 버퍼를 만듦 (max_bytes를 넘으면 그 안에 들어가는 프레임 수로 줄임)"""
+        frame_bytes = int(np.prod(frame_shape)) * np.dtype(dtype).itemsize
+        capacity = min(max(1, round(seconds * fps)), max(1, max_bytes // frame_bytes))
+        return cls(capacity, frame_shape, dtype)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        return self.frames.nbytes
+
+    def append(self, frame):
+        """프레임을 버퍼에 복사 (새 배열을 만들지 않고 제자리에 복사)"""
+        position = (self.start + self.size) % self.capacity
+        np.copyto(self.frames[position], frame)
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def ordered_views(self):
+        """보관 중인 프레임을 오래된 순서로 나눈 뷰(최대 2개)를 반환 (복사하지 않음)
+
+        뷰는 버퍼 메모리를 그대로 가리키므로, 다 쓸 때까지 append()나 clear()를 하면 안 됨
+        """
+        if self.size < self.capacity:
+            return (self.frames[:self.size],)
+        return self.frames[self.start:], self.frames[:self.start]
+
+    def clear(self):
+        self.start = 0
+        self.size = 0
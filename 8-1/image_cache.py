@@ -0,0 +1,143 @@
+"""갤러리 보기용 이미지 읽기 도구
+
+- 파일 헤더만 읽어서 이미지 크기를 알아내고, 큰 이미지는 IMREAD_REDUCED_*로 줄여서 디코딩
+  (JPEG은 디코딩 단계에서 바로 줄이므로 원본 크기로 디코딩하는 것보다 훨씬 빠름)
+- 디코딩한 이미지를 메모리 크기 제한이 있는 LRU 캐시에 보관
+- 옆 이미지를 백그라운드 스레드에서 미리 디코딩 (cv2.imread는 디코딩 중에 GIL을 놓음)
+"""
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+
+# 줄임 배율별 디코딩 옵션
+REDUCED_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+
+
+def read_image_size(path):
+    """PNG, JPEG, WebP 파일의 헤더만 읽어서 (너비, 높이)를 반환 (모르는 형식이면 None)"""
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head[:8] == b'\x89PNG\r\n\x1a\n':
+            # IHDR 청크: 너비, 높이 (big endian 4바이트)
+            return struct.unpack('>II', head[16:24])
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b'VP8L':
+                b0, b1, b2, b3 = head[21:25]
+                return 1 + (b0 | (b1 & 0x3F) << 8), 1 + (b1 >> 6 | b2 << 2 | (b3 & 0x0F) << 10)
+            if chunk == b'VP8X':
+                return (1 + int.from_bytes(head[24:27], 'little'), 1 + int.from_bytes(head[27:30], 'little'))
+            return None
+        if head[:2] == b'\xff\xd8':
+            # JPEG: SOF 마커가 나올 때까지 세그먼트를 건너뜀
+            f.seek(2)
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    return None
+                if marker[1] in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                    # 길이(2), 정밀도(1), 높이(2), 너비(2)
+                    height, width = struct.unpack('>HH', f.read(7)[3:7])
+                    return width, height
+                length = struct.unpack('>H', f.read(2))[0]
+                f.seek(length - 2, 1)
+    return None
+
+
+def load_preview(path, max_size=(1280, 800)):
+    """이미지를 max_size(너비, 높이) 안에 들어가는 크기로 읽는 함수 (읽지 못하면 None)
+
+    원본이 max_size보다 2배 이상 크면 줄여서 디코딩하고, 남은 차이는 resize로 맞춤
+    """
+    max_width, max_height = max_size
+    try:
+        size = read_image_size(path)
+    except (OSError, struct.error):
+        # 헤더가 잘린 파일 등은 원본 크기로 읽어 봄
+        size = None
+    flags = cv2.IMREAD_COLOR
+    if size is not None:
+        width, height = size
+        scale = min(max_width / width, max_height / height)
+        # 줄인 뒤에도 max_size보다 작아지지 않는 가장 큰 배율
+        for factor, flag in REDUCED_FLAGS.items():
+            if 1 / factor >= scale:
+                flags = flag
+                break
+
+    image = cv2.imread(path, flags)
+    if image is None:
+        return None
+    height, width = image.shape[:2]
+    scale = min(max_width / width, max_height / height)
+    if scale < 1:
+        image = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+    return image
+
+
+class ImageCache:
+    """디코딩한 미리보기 이미지를 보관하는 LRU 캐시와 미리 읽기 스레드
+
+    max_bytes: 보관할 이미지 배열의 최대 총 크기 (넘으면 가장 오래 쓰지 않은 이미지부터 버림)
+    max_size: 미리보기 최대 크기 (너비, 높이)
+    workers: 미리 읽기 스레드 수
+    """
+
+    def __init__(self, max_bytes=256 * 1024 ** 2, max_size=(1280, 800), workers=2):
+        self.max_bytes = max_bytes
+        self.max_size = max_size
+        self.nbytes = 0
+        self._images = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def _store(self, path, image):
+        with self._lock:
+            self._pending.pop(path, None)
+            if image is None or path in self._images or image.nbytes > self.max_bytes:
+                return
+            self._images[path] = image
+            self.nbytes += image.nbytes
+            while self.nbytes > self.max_bytes:
+                _, old = self._images.popitem(last=False)
+                self.nbytes -= old.nbytes
+
+    def _load(self, path):
+        image = load_preview(path, self.max_size)
+        self._store(path, image)
+        return image
+
+    def get(self, path):
+        """이미지를 반환 (캐시에 없으면 미리 읽는 중인 결과를 기다리거나 바로 디코딩)"""
+        with self._lock:
+            image = self._images.get(path)
+            if image is not None:
+                self._images.move_to_end(path)
+                return image
+            future = self._pending.get(path)
+        if future is not None:
+            return future.result()
+        return self._load(path)
+
+    def prefetch(self, paths):
+        """캐시에 없는 이미지를 백그라운드에서 디코딩"""
+        with self._lock:
+            for path in paths:
+                if path not in self._images and path not in self._pending:
+                    self._pending[path] = self._executor.submit(self._load, path)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,5 +1,16 @@
+import os
+import sys
+
 import cv2
 
+from image_cache import ImageCache
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp')
+# 다음/이전 이미지 키 (방향키 코드는 Windows, Linux, macOS 순서)
+NEXT_KEYS = {ord('d'), ord('n'), ord(' '), 2555904, 65363, 63235}
+PREVIOUS_KEYS = {ord('a'), ord('p'), 2424832, 65361, 63234}
+
 def display_image(image_path):
     """이미지 파일을 읽어서 화면에 출력하는 함수"""
     # 이미지 파일 읽기
@@ -19,8 +30,55 @@ def display_image(image_path):
     cv2.waitKey(0)
 
 
+def image_gallery(directory, max_size=(1280, 800), cache_bytes=256 * 1024 ** 2, prefetch=2):
+    """폴더 안의 이미지를 키로 넘겨 보는 갤러리 함수
+
+    max_size: 미리보기 최대 크기 (너비, 높이), 큰 이미지는 줄여서 디코딩
+    cache_bytes: 디코딩한 이미지를 보관할 최대 메모리
+    prefetch: 앞으로 미리 디코딩해 둘 이미지 수 (뒤로는 1장)
+    """
+    files = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                   if name.lower().endswith(IMAGE_EXTENSIONS))
+    if not files:
+        print(f'이미지가 없습니다: {directory}')
+        return
+
+    cache = ImageCache(max_bytes=cache_bytes, max_size=max_size)
+    index = 0
+    print('ESC: 종료 | →, d, n, Space: 다음 | ←, a, p: 이전')
+
+    while True:
+        path = files[index]
+        image = cache.get(path)
+        # 다음 이미지들과 이전 이미지를 백그라운드에서 미리 디코딩
+        neighbours = [files[(index + step) % len(files)] for step in range(1, prefetch + 1)]
+        cache.prefetch(neighbours + [files[index - 1]])
+
+        if image is None:
+            print(f'이미지를 불러올 수 없습니다: {path}')
+        else:
+            cv2.imshow('Image Gallery', image)
+            cv2.setWindowTitle('Image Gallery', f'[{index + 1}/{len(files)}] {os.path.basename(path)}')
+
+        # waitKeyEx()는 방향키 코드도 그대로 돌려줌
+        key = cv2.waitKeyEx(0)
+        if key == 27:
+            break
+        if key in NEXT_KEYS:
+            index = (index + 1) % len(files)
+        elif key in PREVIOUS_KEYS:
+            index = (index - 1) % len(files)
+
+    cache.close()
+    cv2.destroyAllWindows()
+
+
 # 실행 예제
 if __name__ == '__main__':
-    # 이미지 파일 경로를 입력하세요
-    image_path = '2.png'
-    display_image(image_path)
+    # 폴더를 인자로 주면 갤러리 모드 (예: python img.py .)
+    if len(sys.argv) > 1 and os.path.isdir(sys.argv[1]):
+        image_gallery(sys.argv[1])
+    else:
+        # 이미지 파일 경로를 입력하세요
+        image_path = '2.png'
+        display_image(image_path)
@@ -0,0 +1,239 @@
+"""여러 이미지 파일을 화면 없이(headless) 프로세스 풀에서 변환/크기 조정하는 배치 실행기
+
+- 파일은 메모리 매핑(mmap)으로 읽어서 cv2.imdecode()로 디코딩 (파일 내용을 한 번 더 복사하지 않음)
+- 크게 줄일 이미지는 IMREAD_REDUCED_*로 줄여서 디코딩
+- 변환 결과는 작업 프로세스가 바로 파일로 저장하고, 이미 최신인 결과 파일은 건너뜀
+  (출력 폴더의 기록 파일에 원본의 수정 시각/크기와 변환 설정을 남겨서, 설정이 바뀌면 다시 변환)
+
+사용 예:
+    python img_batch.py . --format jpg --max-side 800
+    python img_batch.py assets/ 'more/*.png' --format webp --quality 80 --output converted --workers 8
+"""
+import argparse
+import glob
+import json
+import mmap
+import os
+import time
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+from batch_pool import process_pool
+from image_cache import REDUCED_FLAGS, read_image_size
+from img import IMAGE_EXTENSIONS
+
+
+QUALITY_FLAGS = {
+    'jpg': cv2.IMWRITE_JPEG_QUALITY,
+    'webp': cv2.IMWRITE_WEBP_QUALITY,
+}
+# 출력 폴더에 저장하는 변환 기록 (결과 파일별 원본 정보와 변환 설정)
+MANIFEST_NAME = '.img_batch.json'
+
+
+def _is_inside(path, directory):
+    path, directory = os.path.realpath(path), os.path.realpath(directory)
+    return os.path.commonpath([path, directory]) == directory
+
+
+def find_images(inputs, exclude_dir=None):
+    """폴더(하위 폴더 포함) 또는 glob 패턴에서 (이미지 경로, 출력 기준 상대 경로) 목록을 만드는 함수
+
+    exclude_dir: 찾지 않을 폴더 (출력 폴더가 입력 폴더 안에 있을 때 결과 파일을 다시 변환하지 않도록)
+    """
+    images = {}
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, names in os.walk(item):
+                if exclude_dir is not None:
+                    dirs[:] = [d for d in dirs if not _is_inside(os.path.join(root, d), exclude_dir)]
+                for name in sorted(names):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        images.setdefault(path, os.path.relpath(path, item))
+        else:
+            for path in sorted(glob.glob(item)):
+                if exclude_dir is not None and _is_inside(path, exclude_dir):
+                    continue
+                if path.lower().endswith(IMAGE_EXTENSIONS):
+                    images.setdefault(path, os.path.basename(path))
+    return list(images.items())
+
+
+def output_path_for(relative, output_dir, image_format):
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + '.' + image_format)
+
+
+def load_manifest(output_dir):
+    """{출력 폴더 기준 결과 파일 경로: 변환 기록} (없거나 읽을 수 없으면 빈 dict)"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    temp = f'{path}.{os.getpid()}.tmp'
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(temp, path)
+
+
+def conversion_record(source, image_format, quality, max_side):
+    """원본의 현재 상태와 변환 설정 (변환 전에 만들어서, 변환 중에 원본이 바뀌면 다음에 다시 변환되게 함)"""
+    stat = os.stat(source)
+    return {'source': os.path.realpath(source), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+            'format': image_format, 'quality': quality, 'max_side': max_side}
+
+
+def is_up_to_date(target, record, previous):
+    """결과 파일이 있고, 같은 원본을 같은 설정으로 변환한 기록이 있으면 True"""
+    return previous == record and os.path.exists(target)
+
+
+def _decode_flags(path, max_side):
+    # 줄인 뒤에도 max_side보다 작아지지 않는 가장 큰 배율로 디코딩
+    if not max_side:
+        return cv2.IMREAD_COLOR
+    size = read_image_size(path)
+    if size is None:
+        return cv2.IMREAD_COLOR
+    scale = max_side / max(size)
+    for factor, flag in REDUCED_FLAGS.items():
+        if 1 / factor >= scale:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def read_image_mmap(path, flags=cv2.IMREAD_COLOR):
+    """메모리 매핑한 파일 내용을 바로 디코딩하는 함수 (읽지 못하면 None)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            buffer = np.frombuffer(mapped, dtype=np.uint8)
+            image = cv2.imdecode(buffer, flags)
+            # mmap을 닫기 전에 버퍼 참조를 없애야 함
+            del buffer
+    return image
+
+
+def convert_image(source, target, image_format='jpg', quality=90, max_side=None):
+    """이미지 하나를 변환해서 저장하는 함수 (프로세스 풀에서 실행)
+
+    반환: (원본 경로, 원본 바이트 수, 결과 바이트 수, 오류 메시지 또는 None)
+    """
+    try:
+        image = read_image_mmap(source, _decode_flags(source, max_side))
+        if image is None:
+            return source, 0, 0, '디코딩 실패'
+        height, width = image.shape[:2]
+        if max_side and max(height, width) > max_side:
+            scale = max_side / max(height, width)
+            image = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+
+        ok, encoded = cv2.imencode('.' + image_format, image, [QUALITY_FLAGS[image_format], quality])
+        if not ok:
+            return source, 0, 0, '인코딩 실패'
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        # 중간에 멈춰도 덜 쓴 파일이 최신 결과로 보이지 않도록 임시 파일에 쓰고 이름을 바꿈
+        temp = f'{target}.{os.getpid()}.tmp'
+        with open(temp, 'wb') as f:
+            f.write(encoded.tobytes())
+        os.replace(temp, target)
+        return source, os.path.getsize(source), len(encoded), None
+    except (OSError, cv2.error, ValueError) as error:
+        return source, 0, 0, str(error)
+
+
+def _convert_task(task):
+    return convert_image(*task)
+
+
+def run_batch(images, output_dir, image_format='jpg', quality=90, max_side=None, workers=None, force=False):
+    """이미지 목록을 프로세스 풀에서 변환하고 처리 속도를 출력하는 함수"""
+    start = time.perf_counter()
+    sources_by_target = defaultdict(list)
+    for source, relative in images:
+        sources_by_target[output_path_for(relative, output_dir, image_format)].append(source)
+
+    manifest = load_manifest(output_dir)
+    tasks = []
+    records = []
+    skipped = failed = 0
+    for target, sources in sources_by_target.items():
+        # 다른 폴더의 같은 이름 파일(glob 입력)이나 확장자만 다른 파일은 결과 파일이 겹치므로 변환하지 않음
+        if len(sources) > 1:
+            failed += len(sources)
+            print(f"- {target}: 실패 (원본 {len(sources)}개가 같은 결과 파일로 저장됨: {', '.join(sources)})")
+            continue
+        source = sources[0]
+        try:
+            record = conversion_record(source, image_format, quality, max_side)
+        except OSError as error:
+            failed += 1
+            print(f'- {source}: 실패 ({error})')
+            continue
+        key = os.path.relpath(target, output_dir)
+        if not force and is_up_to_date(target, record, manifest.get(key)):
+            skipped += 1
+            continue
+        tasks.append((source, target, image_format, quality, max_side))
+        records.append((key, record))
+
+    print(f'=== 이미지 {len(images)}개 중 {len(tasks)}개 변환, {skipped}개는 이미 최신 '
+          f'(프로세스 {workers or os.cpu_count()}개) ===')
+    converted = 0
+    bytes_in = bytes_out = 0
+    try:
+        with process_pool(workers) as executor:
+            # map()은 결과를 순서대로 바로바로 돌려주므로 전체 결과를 모아 둘 필요가 없음
+            results = executor.map(_convert_task, tasks, chunksize=16)
+            for (key, record), (source, size_in, size_out, error) in zip(records, results):
+                if error is not None:
+                    failed += 1
+                    manifest.pop(key, None)
+                    print(f'- {source}: 실패 ({error})')
+                    continue
+                converted += 1
+                bytes_in += size_in
+                bytes_out += size_out
+                manifest[key] = record
+    finally:
+        # 중간에 멈춰도 이미 변환한 파일은 다음 실행에서 건너뛰도록 기록을 저장
+        if tasks:
+            save_manifest(output_dir, manifest)
+
+    elapsed = time.perf_counter() - start
+    speed = converted / elapsed if elapsed else 0
+    print(f'변환 {converted}개, 건너뜀 {skipped}개, 실패 {failed}개, {elapsed:.2f}초 ({speed:,.1f} 이미지/초)')
+    print(f'용량: {bytes_in / 1024 ** 2:,.1f}MB → {bytes_out / 1024 ** 2:,.1f}MB')
+    return converted, skipped, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='여러 이미지 파일 일괄 변환/크기 조정 (화면 없음)')
+    parser.add_argument('inputs', nargs='+', help='이미지 폴더(하위 폴더 포함) 또는 glob 패턴')
+    parser.add_argument('--output', default='img_output', help='결과를 저장할 폴더')
+    parser.add_argument('--format', choices=sorted(QUALITY_FLAGS), default='jpg', help='출력 형식')
+    parser.add_argument('--quality', type=int, default=90, help='출력 품질 (1~100)')
+    parser.add_argument('--max-side', type=int, help='긴 변의 최대 길이 (비율 유지, 줄이기만 함)')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: CPU 코어 수)')
+    parser.add_argument('--force', action='store_true', help='최신 결과가 있어도 다시 변환')
+    args = parser.parse_args()
+
+    images = find_images(args.inputs, exclude_dir=args.output)
+    if not images:
+        print(f'이미지 파일을 찾을 수 없습니다: {args.inputs}')
+        return
+    run_batch(images, args.output, args.format, args.quality, args.max_side, args.workers, args.force)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""프레임 사이의 움직임과 장면 전환을 찾아서 자동 캡처/녹화를 결정하는 도구
+
+프레임을 작은 흑백 영상으로 줄인 뒤 비교하므로 디코딩보다 훨씬 빠르게(코어 하나로) 처리할 수 있다.
+- 움직임: 이전 프레임과 밝기 차이가 pixel_threshold보다 큰 픽셀의 비율
+- 장면 전환: 밝기 히스토그램 사이의 Bhattacharyya 거리 (0이면 같고 1이면 완전히 다름)
+"""
+import cv2
+import numpy as np
+
+
+class MotionDetector:
+    """축소한 흑백 프레임의 차이와 히스토그램 거리로 움직임과 장면 전환을 찾는 검출기
+
+    width: 비교할 때 줄일 너비 (높이는 비율 유지)
+    pixel_threshold: 움직인 픽셀로 볼 밝기 차이 (0~255)
+    motion_ratio: 움직인 픽셀 비율이 이 값 이상이면 움직임
+    scene_threshold: 히스토그램 거리가 이 값 이상이면 장면 전환
+    """
+
+    def __init__(self, width=160, pixel_threshold=25, motion_ratio=0.02, scene_threshold=0.5, bins=32):
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.motion_ratio = motion_ratio
+        self.scene_threshold = scene_threshold
+        self.bins = bins
+        self.reset()
+
+    def reset(self):
+        self._previous = None
+        self._previous_hist = None
+        # 같은 크기의 배열을 매 프레임 새로 만들지 않도록 한 번 만든 배열을 재사용
+        self._small = None
+        self._gray = None
+        self._diff = None
+        self.changed_ratio = 0.0
+        self.hist_distance = 0.0
+
+    def update(self, frame):
+        """프레임 하나를 비교하고 (움직임 여부, 장면 전환 여부)를 반환"""
+        if self._small is None:
+            height = max(1, round(frame.shape[0] * self.width / frame.shape[1]))
+            self._small = np.empty((height, self.width, 3), dtype=np.uint8)
+            self._gray = np.empty((height, self.width), dtype=np.uint8)
+            self._diff = np.empty((height, self.width), dtype=np.uint8)
+            self._previous = np.empty((height, self.width), dtype=np.uint8)
+
+        cv2.resize(frame, (self.width, self._small.shape[0]), dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        hist = cv2.calcHist([self._gray], [0], None, [self.bins], [0, 256])
+        cv2.normalize(hist, hist, norm_type=cv2.NORM_L1)
+
+        if self._previous_hist is None:
+            moving = scene_change = False
+        else:
+            cv2.absdiff(self._gray, self._previous, dst=self._diff)
+            cv2.threshold(self._diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._diff)
+            self.changed_ratio = cv2.countNonZero(self._diff) / self._diff.size
+            self.hist_distance = cv2.compareHist(hist, self._previous_hist, cv2.HISTCMP_BHATTACHARYYA)
+            moving = self.changed_ratio >= self.motion_ratio
+            scene_change = self.hist_distance >= self.scene_threshold
+
+        # 현재 프레임을 다음 비교 대상으로 (배열을 맞바꿔서 복사하지 않음)
+        self._previous, self._gray = self._gray, self._previous
+        self._previous_hist = hist
+        return moving, scene_change
+
+
+class AutoTrigger:
+    """검출 결과로 자동 캡처와 자동 녹화 시작/중지를 결정
+
+    시간은 프레임 수로 계산하므로 재생 속도와 관계없이(배치 처리에서도) 같은 결과가 나온다.
+    fps: 동영상 FPS
+    stop_after: 움직임이 이 시간(초) 동안 없으면 자동 녹화를 멈춤
+    snapshot_cooldown: 장면 전환 캡처 사이의 최소 간격(초)
+    """
+
+    def __init__(self, fps, stop_after=2.0, snapshot_cooldown=1.0):
+        self.stop_after_frames = max(1, round(stop_after * fps))
+        self.cooldown_frames = max(1, round(snapshot_cooldown * fps))
+        self.recording = False
+        self._still_frames = 0
+        self._last_snapshot = None
+
+    def update(self, index, moving, scene_change):
+        """프레임 번호와 검출 결과를 받아 할 일 목록('snapshot', 'start', 'stop')을 반환"""
+        actions = []
+        if scene_change and (self._last_snapshot is None or index - self._last_snapshot >= self.cooldown_frames):
+            self._last_snapshot = index
+            actions.append('snapshot')
+
+        if moving:
+            self._still_frames = 0
+            if not self.recording:
+                self.recording = True
+                actions.append('start')
+        elif self.recording:
+            self._still_frames += 1
+            if self._still_frames >= self.stop_after_frames:
+                self.recording = False
+                actions.append('stop')
+        return actions
+
+    def cancel(self):
+        """자동 녹화를 밖에서 멈췄을 때 상태를 맞춤"""
+        self.recording = False
+        self._still_frames = 0
@@ -0,0 +1,179 @@
+"""동영상 재생 성능 측정 도구
+
+프레임마다 단계별 소요 시간을 기록하고, 끝날 때 지연 시간 분포(p50/p95/p99)와
+실제 FPS, 건너뛴/늦은 프레임 수를 요약한다. 코덱이나 컴퓨터를 비교할 수 있도록
+요약을 JSON 또는 CSV 파일로 저장할 수 있다.
+
+단계 이름:
+    decode: 디코딩 스레드의 cap.read()
+    wait: 재생 루프가 디코딩된 프레임을 기다린 시간 (디코딩이 느리면 커짐)
+    display: cv2.imshow()
+    write: 쓰기 스레드의 VideoWriter.write()
+    imwrite: 쓰기 스레드의 cv2.imwrite()
+
+단계별 소요 시간은 로그 간격 히스토그램에 횟수만 세므로, 오래 재생해도 메모리가 늘지 않는다.
+"""
+import csv
+import json
+import math
+import platform
+import time
+
+import cv2
+
+
+STAGES = ['decode', 'wait', 'display', 'write', 'imwrite']
+
+# 히스토그램 범위: 1µs ~ 100초, 10배마다 구간 40개 (구간 너비 약 6%)
+HISTOGRAM_MIN_SECONDS = 1e-6
+HISTOGRAM_DECADES = 8
+HISTOGRAM_BUCKETS_PER_DECADE = 40
+
+
+class LatencyHistogram:
+    """소요 시간을 로그 간격 구간의 횟수로 세는 고정 크기 히스토그램
+
+    횟수, 합계, 최솟값, 최댓값은 정확히 기록하고, 백분위수는 해당 구간 안에서 보간해서 구함
+    (오차는 구간 너비 이내). 범위를 벗어난 값은 양 끝 구간에 넣음
+    """
+
+    def __init__(self):
+        self.buckets = [0] * (HISTOGRAM_DECADES * HISTOGRAM_BUCKETS_PER_DECADE)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, seconds):
+        if seconds > HISTOGRAM_MIN_SECONDS:
+            index = int(math.log10(seconds / HISTOGRAM_MIN_SECONDS) * HISTOGRAM_BUCKETS_PER_DECADE)
+            index = min(index, len(self.buckets) - 1)
+        else:
+            index = 0
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def _edge(self, index):
+        return HISTOGRAM_MIN_SECONDS * 10 ** (index / HISTOGRAM_BUCKETS_PER_DECADE)
+
+    def percentile(self, q):
+        """q(0~100) 백분위수(초)를 반환 (구간 안에서는 로그 간격으로 보간)"""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.buckets):
+            if bucket_count and cumulative + bucket_count >= rank:
+                # 실제 최솟값/최댓값 밖으로 나가지 않도록 구간 경계를 좁힘
+                low = max(self._edge(index), self.min)
+                high = min(self._edge(index + 1), self.max)
+                if low >= high:
+                    return low
+                fraction = (rank - cumulative) / bucket_count
+                return low * (high / low) ** fraction
+            cumulative += bucket_count
+        return self.max
+
+
+class PlaybackStats:
+    """재생 중 단계별 소요 시간과 건너뛴/늦은 프레임 수를 기록
+
+    nominal_fps: 동영상에 기록된 FPS
+    add()는 디코딩/쓰기 스레드에서도 호출함 (단계마다 한 스레드만 기록하므로 안전)
+    """
+
+    def __init__(self, nominal_fps):
+        self.nominal_fps = nominal_fps
+        # 단계 이름: LatencyHistogram (스레드가 동시에 만들지 않도록 미리 만들어 둠)
+        self.timings = {stage: LatencyHistogram() for stage in STAGES}
+        self.frames = 0      # 재생 루프가 처리한 프레임
+        self.displayed = 0   # 화면에 표시한 프레임
+        self.dropped = 0     # 늦어서 표시하지 않은 프레임
+        self.late = 0        # 표시할 시각보다 늦게 표시한 프레임
+        self.write_dropped = 0  # 쓰기 대기열이 가득 차서 녹화하지 못한 프레임
+        self._start = None
+        self._end = None
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def stop(self):
+        self._end = time.perf_counter()
+
+    def add(self, stage, seconds):
+        self.timings[stage].add(seconds)
+
+    @property
+    def elapsed(self):
+        if self._start is None:
+            return 0.0
+        return (self._end or time.perf_counter()) - self._start
+
+    def stage_summary(self):
+        """단계별 횟수와 소요 시간 통계(ms) 목록을 반환"""
+        rows = []
+        for stage in STAGES:
+            histogram = self.timings[stage]
+            if not histogram.count:
+                continue
+            p50, p95, p99 = (histogram.percentile(q) * 1000 for q in (50, 95, 99))
+            rows.append({'stage': stage, 'count': histogram.count,
+                         'mean_ms': round(histogram.total / histogram.count * 1000, 3),
+                         'p50_ms': round(p50, 3), 'p95_ms': round(p95, 3),
+                         'p99_ms': round(p99, 3), 'max_ms': round(histogram.max * 1000, 3)})
+        return rows
+
+    def summary(self):
+        """전체 요약을 dict로 반환"""
+        elapsed = self.elapsed
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'nominal_fps': round(self.nominal_fps, 3),
+            'effective_fps': round(self.frames / elapsed, 3) if elapsed else None,
+            'display_fps': round(self.displayed / elapsed, 3) if elapsed else None,
+            'frames': self.frames,
+            'displayed': self.displayed,
+            'dropped': self.dropped,
+            'late': self.late,
+            'write_dropped': self.write_dropped,
+            'stages': self.stage_summary(),
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print()
+        print('=== 재생 성능 ===')
+        print(f"프레임 {summary['frames']}개 (표시 {summary['displayed']}, 건너뜀 {summary['dropped']}, "
+              f"늦게 표시 {summary['late']}, 녹화 누락 {summary['write_dropped']}), {summary['elapsed_s']:.2f}초")
+        if summary['effective_fps'] is not None:
+            print(f"FPS: 처리 {summary['effective_fps']:.2f} / 표시 {summary['display_fps']:.2f} "
+                  f"/ 동영상 {summary['nominal_fps']:.2f}")
+        print(f"{'단계':<8}{'횟수':>7}{'평균':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'최대':>9} (ms)")
+        for row in summary['stages']:
+            print(f"{row['stage']:<8}{row['count']:>7}{row['mean_ms']:>9.2f}{row['p50_ms']:>9.2f}"
+                  f"{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['max_ms']:>9.2f}")
+
+    def export(self, path, video_path=None):
+        """요약을 파일로 저장 (.csv이면 단계별 표, 그 외에는 JSON)"""
+        summary = self.summary()
+        if path.lower().endswith('.csv'):
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                fields = ['stage', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(summary['stages'])
+            return
+        summary.update({
+            'video': video_path,
+            'opencv': cv2.__version__,
+            'python': platform.python_version(),
+            'machine': platform.platform(),
+        })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
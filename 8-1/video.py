@@ -1,6 +1,21 @@
-import cv2
+import argparse
+import time
 from datetime import datetime
 
+import cv2
+
+from frame_buffer import FrameRingBuffer
+from motion import AutoTrigger, MotionDetector
+from playback_stats import PlaybackStats
+from video_io import FrameReader, FrameWriter
+
+
+# 화면 표시가 늦어졌을 때 연속으로 건너뛸 수 있는 최대 프레임 수 (창이 멈춰 보이지 않도록 제한)
+MAX_SKIPPED_FRAMES = 5
+# 녹화를 시작할 때 함께 저장할 직전 장면의 길이(초)
+# (버퍼는 frame_buffer.MAX_BUFFER_BYTES를 넘지 않도록 줄이므로 고해상도에서는 더 짧아짐)
+PREROLL_SECONDS = 3
+
 
 def get_filename_with_timestamp():
     """현재 시간을 기반으로 파일명 생성"""
@@ -8,36 +23,136 @@ def get_filename_with_timestamp():
     return now.strftime('%Y%m%d_%H-%M-%S')
 
 
-def video_player_with_controls(video_path):
-    """단축키 기반 동영상 재생 및 제어 함수"""
+def save_capture(writer, frame, suffix=''):
+    """현재 프레임을 JPG로 저장 요청하고 파일명을 반환"""
+    filename = get_filename_with_timestamp() + suffix + '.jpg'
+    writer.save_image(filename, frame)
+    return filename
+
+
+def start_recording(writer, frame, fps, preroll=None):
+    """녹화를 시작하고 (파일명, 직전 장면을 다 쓰면 set 되는 Event 또는 None)을 반환
+
+    직전 장면 버퍼는 복사하지 않고 그대로 쓰기 스레드에 넘기므로
+    Event가 set 될 때까지 버퍼에 프레임을 추가하면 안 됨
+    """
+    filename = get_filename_with_timestamp() + '.mp4'
+    fourcc = cv2.VideoWriter_fourcc(*'avc1')  # macOS 권장 코덱
+    frame_height, frame_width = frame.shape[:2]
+    writer.start_recording(filename, fourcc, fps, (frame_width, frame_height))
+    # 현재 프레임까지의 직전 장면을 먼저 쓰고, 다음 프레임부터 실시간으로 씀
+    drained = None
+    if preroll is not None and len(preroll):
+        drained = writer.write_many(preroll.ordered_views())
+    return filename, drained
+
+
+def video_player_with_controls(video_path, preroll_seconds=PREROLL_SECONDS, auto_detect=False, stats_path=None):
+    """단축키 기반 동영상 재생 및 제어 함수
+
+    preroll_seconds: Ctrl+X로 녹화를 시작할 때 앞에 붙일 직전 장면의 길이(초), 0이면 사용하지 않음
+    auto_detect: True이면 장면 전환 때 자동 캡처, 움직임이 있는 동안 자동 녹화 (Ctrl+D로 켜고 끔)
+    stats_path: 재생 성능 요약을 저장할 파일 (.json 또는 .csv), None이면 화면에만 출력
+    """
     cap = cv2.VideoCapture(video_path)
 
     if not cap.isOpened():
         print(f'동영상을 열 수 없습니다: {video_path}')
         return
 
-    fps = int(cap.get(cv2.CAP_PROP_FPS))
-    if fps == 0:
+    # 14.29, 29.97처럼 정수가 아닌 FPS도 그대로 사용
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if not fps or fps <= 0:
         fps = 30  # FPS 정보가 없을 경우 기본값 설정
+    frame_interval = 1.0 / fps
+    stats = PlaybackStats(fps)
 
     is_recording = False
-    video_writer = None
+    auto_recording = False  # 현재 녹화를 자동 감지가 시작했는지
+    detector = MotionDetector()
+    trigger = AutoTrigger(fps)
+    # 직전 장면 버퍼 (첫 프레임의 해상도로 한 번만 할당)
+    preroll = None
+    # 쓰기 스레드가 직전 장면 버퍼를 다 쓰면 set 되는 Event (쓰는 동안 버퍼를 건드리지 않음)
+    preroll_drained = None
+    # 녹화와 캡처 저장은 별도 스레드에서 인코딩
+    writer = FrameWriter(stats=stats)
+
+    # 디코딩은 별도 스레드에서 미리 해 둠
+    reader = FrameReader(cap, stats=stats).start()
+    start_time = None
+    skipped = 0
 
     print('동영상 재생 시작')
-    print('ESC: 종료 | Ctrl+Z: 캡처 | Ctrl+X: 녹화 시작 | Ctrl+C: 녹화 중지')
+    print('ESC: 종료 | Ctrl+Z: 캡처 | Ctrl+X: 녹화 시작 | Ctrl+C: 녹화 중지 | Ctrl+D: 자동 감지 켜기/끄기')
 
+    stats.start()
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        wait_start = time.perf_counter()
+        item = reader.read()
+        stats.add('wait', time.perf_counter() - wait_start)
+        if item is None:
             print('동영상 재생 완료')
             break
-
-        if is_recording and video_writer is not None:
-            video_writer.write(frame)
-
+        index, frame = item
+        stats.frames += 1
+
+        if is_recording:
+            writer.write(frame)
+
+        if preroll_seconds > 0:
+            if preroll is None:
+                preroll = FrameRingBuffer.for_duration(preroll_seconds, fps, frame.shape, frame.dtype)
+                print(f'직전 장면 버퍼: {preroll.capacity}프레임 ({preroll.capacity / fps:.1f}초), '
+                      f'{preroll.nbytes / 1024 ** 2:.1f}MB')
+            if preroll_drained is not None and preroll_drained.is_set():
+                # 녹화 파일에 다 썼으면 녹화 전 프레임은 버리고 새로 모음
+                preroll.clear()
+                preroll_drained = None
+            # 녹화 중인 프레임은 파일에 바로 들어가므로 모으지 않음
+            if not is_recording and preroll_drained is None:
+                preroll.append(frame)
+
+        # 자동 감지: 화면 표시를 건너뛰는 프레임도 모두 검사
+        if auto_detect:
+            for action in trigger.update(index, *detector.update(frame)):
+                if action == 'snapshot':
+                    filename = save_capture(writer, frame, f'_scene{index:06d}')
+                    print(f'장면 전환 자동 캡처: {filename}')
+                elif action == 'start' and not is_recording:
+                    filename, drained = start_recording(
+                        writer, frame, fps, preroll if preroll_drained is None else None)
+                    if drained is not None:
+                        preroll_drained = drained
+                    is_recording = auto_recording = True
+                    print(f'움직임 감지, 자동 녹화 시작: {filename}')
+                elif action == 'stop' and auto_recording:
+                    writer.stop_recording()
+                    is_recording = auto_recording = False
+                    print('움직임 없음, 자동 녹화 중지')
+
+        # 프레임 번호 × 프레임 간격으로 표시할 시각을 정함 (단조 시계 기준)
+        if start_time is None:
+            start_time = time.monotonic()
+        due = start_time + index * frame_interval
+
+        # 한 프레임 이상 늦은 프레임은 표시하지 않고 건너뜀 (녹화에는 포함)
+        if time.monotonic() - due > frame_interval and skipped < MAX_SKIPPED_FRAMES:
+            skipped += 1
+            stats.dropped += 1
+            continue
+        skipped = 0
+
+        display_start = time.perf_counter()
+        # 반 프레임 이상 늦게 표시하면 늦은 프레임으로 셈
+        if time.monotonic() - due > frame_interval / 2:
+            stats.late += 1
         cv2.imshow('Video Player', frame)
+        stats.add('display', time.perf_counter() - display_start)
+        stats.displayed += 1
 
-        key = cv2.waitKey(33)
+        # 다음 프레임을 표시할 시각까지 키 입력 대기 (waitKey(0)은 무한 대기이므로 최소 1ms)
+        key = cv2.waitKey(max(1, int((due + frame_interval - time.monotonic()) * 1000)))
 
         # ESC: 종료
         if key == 27:
@@ -46,17 +161,18 @@ def video_player_with_controls(video_path):
 
         # Ctrl+Z: 캡처
         elif key == 26:
-            filename = get_filename_with_timestamp() + '.jpg'
-            cv2.imwrite(filename, frame)
+            filename = save_capture(writer, frame)
             print(f'화면 캡처 완료: {filename}')
 
         # Ctrl+X: 녹화 시작
         elif key == 24:
             if not is_recording:
-                filename = get_filename_with_timestamp() + '.mp4'
-                fourcc = cv2.VideoWriter_fourcc(*'avc1')  # macOS 권장 코덱
-                frame_height, frame_width = frame.shape[:2]
-                video_writer = cv2.VideoWriter(filename, fourcc, fps, (frame_width, frame_height))
+                # 이전 녹화의 직전 장면을 아직 쓰는 중이면 버퍼 내용이 오래된 것이므로 넘기지 않음
+                # (쓰는 중인 Event는 덮어쓰지 않아야, 다 쓴 뒤에 버퍼를 비우고 다시 모음)
+                filename, drained = start_recording(
+                    writer, frame, fps, preroll if preroll_drained is None else None)
+                if drained is not None:
+                    preroll_drained = drained
                 is_recording = True
                 print(f'녹화 시작: {filename}')
             else:
@@ -65,21 +181,52 @@ def video_player_with_controls(video_path):
         # Ctrl+C: 녹화 중지
         elif key == 3:
             if is_recording:
-                is_recording = False
-                if video_writer is not None:
-                    video_writer.release()
-                    video_writer = None
+                is_recording = auto_recording = False
+                trigger.cancel()
+                writer.stop_recording()
                 print('녹화 중지')
             else:
                 print('녹화 중이 아닙니다')
 
-    # 자동 저장하는 코드
-    if video_writer is not None:
-        video_writer.release()
+        # Ctrl+D: 자동 감지 켜기/끄기
+        elif key == 4:
+            auto_detect = not auto_detect
+            # 꺼져 있던 동안의 프레임과 비교하지 않도록 초기화
+            detector.reset()
+            print(f"자동 감지 {'켜짐' if auto_detect else '꺼짐'}")
+            if not auto_detect:
+                # 자동 녹화는 끌 방법이 없어지므로 함께 중지 (직접 시작한 녹화는 그대로 둠)
+                trigger.cancel()
+                if auto_recording:
+                    writer.stop_recording()
+                    is_recording = auto_recording = False
+                    print('자동 녹화 중지')
+
+    stats.stop()
+
+    # 자동 저장하는 코드 (쓰기를 기다리는 프레임과 캡처를 모두 저장한 뒤 끝냄)
+    reader.stop()
+    writer.close()
+    stats.write_dropped = writer.dropped_frames
+    stats.print_summary()
+    if stats_path:
+        stats.export(stats_path, video_path)
+        print(f'재생 성능 요약을 {stats_path} 파일로 저장했습니다.')
     cap.release()
     cv2.destroyAllWindows()
 
 
+def main():
+    parser = argparse.ArgumentParser(description='단축키로 제어하는 동영상 재생기')
+    parser.add_argument('video_path', nargs='?', default='6.mp4', help='재생할 동영상 파일')
+    parser.add_argument('--stats', help='재생 성능 요약을 저장할 파일 (.json 또는 .csv)')
+    parser.add_argument('--preroll', type=float, default=PREROLL_SECONDS,
+                        help='녹화 앞에 붙일 직전 장면 길이(초), 0이면 사용하지 않음')
+    parser.add_argument('--auto-detect', action='store_true', help='처음부터 자동 감지를 켬 (Ctrl+D로 켜고 끔)')
+    args = parser.parse_args()
+    video_player_with_controls(args.video_path, preroll_seconds=args.preroll,
+                               auto_detect=args.auto_detect, stats_path=args.stats)
+
+
 if __name__ == '__main__':
-    video_path = '6.mp4'
-    video_player_with_controls(video_path)
+    main()
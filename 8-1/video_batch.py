@@ -0,0 +1,271 @@
+"""여러 동영상 파일을 화면 없이(headless) 프로세스 풀에서 한꺼번에 처리하는 배치 실행기
+
+작업 종류:
+    transcode: 다른 코덱/크기로 다시 인코딩
+    extract: 지정한 시각(--times) 또는 N 프레임마다(--every) 프레임을 JPG로 저장
+             (필요한 위치로 바로 이동(seek)해서 모든 프레임을 디코딩하지 않음)
+    detect: 장면 전환 때 JPG를 저장하고, 움직임이 있는 구간을 동영상 클립으로 저장
+
+사용 예:
+    python video_batch.py transcode 3.mp4 5.mp4 6.mp4 --width 640
+    python video_batch.py extract '*.mp4' --times 0.5 1.0 2.5
+    python video_batch.py extract '*.mp4' --every 30 --workers 4
+    python video_batch.py detect '*.mp4' --preroll 1
+"""
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import as_completed
+
+import cv2
+
+from batch_pool import process_pool
+from frame_buffer import FrameRingBuffer
+from motion import AutoTrigger, MotionDetector
+from video import get_filename_with_timestamp
+from video_io import FrameReader, FrameWriter
+
+
+# 이 값보다 간격이 짧으면 seek 대신 grab()으로 건너뜀
+# (seek는 앞의 키프레임부터 다시 디코딩하므로 간격이 짧으면 오히려 느림)
+SEEK_MIN_STEP = 30
+# 기본 코덱 (avc1(H.264)은 OpenCV 빌드에 따라 인코더가 없어서 파일을 만들지 못하는 경우가 많음)
+DEFAULT_FOURCC = 'mp4v'
+
+
+def find_files(patterns):
+    """파일 경로 또는 glob 패턴 목록에서 파일 목록을 만드는 함수 (중복 제거, 정렬)"""
+    files = []
+    for pattern in patterns:
+        files.extend(sorted(glob.glob(pattern)))
+    return list(dict.fromkeys(files))
+
+
+def _open(video_path):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise OSError(f'동영상을 열 수 없습니다: {video_path}')
+    return cap
+
+
+def _output_name(video_path, output_dir, suffix):
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(output_dir, f'{stem}_{get_filename_with_timestamp()}{suffix}')
+
+
+def transcode(video_path, output_dir, fourcc=DEFAULT_FOURCC, width=None):
+    """동영상을 다시 인코딩해서 저장하는 함수 (width를 주면 비율을 유지하며 크기 변경)
+
+    반환: (처리한 프레임 수, 출력 파일 목록)
+    """
+    cap = _open(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    size = None
+    frames = 0
+    output_path = _output_name(video_path, output_dir, '.mp4')
+
+    # 디코딩과 인코딩을 각각 별도 스레드에서 처리 (배치에서는 프레임을 버리지 않도록 block=True)
+    reader = FrameReader(cap).start()
+    writer = FrameWriter(block=True)
+    try:
+        while True:
+            item = reader.read()
+            if item is None:
+                break
+            _, frame = item
+            if width is not None:
+                height = round(frame.shape[0] * width / frame.shape[1])
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            if size is None:
+                size = (frame.shape[1], frame.shape[0])
+                # 파일을 열지 못하면 OSError로 실패 처리 (없는 파일을 결과로 보고하지 않도록)
+                writer.start_recording(output_path, cv2.VideoWriter_fourcc(*fourcc), fps, size, wait=True)
+            writer.write(frame)
+            frames += 1
+    finally:
+        reader.stop()
+        writer.close()
+        cap.release()
+    return frames, [output_path] if frames else []
+
+
+def _frame_positions(cap, times=None, every=None):
+    # 저장할 프레임 번호 목록 (시각은 FPS로 프레임 번호로 바꿈)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    if times:
+        positions = sorted({round(t * fps) for t in times})
+    else:
+        positions = range(0, total, every)
+    return [p for p in positions if 0 <= p < total]
+
+
+def extract_frames(video_path, output_dir, times=None, every=None):
+    """지정한 시각 또는 N 프레임마다 프레임을 JPG로 저장하는 함수
+
+    반환: (저장한 프레임 수, 출력 파일 목록)
+    """
+    cap = _open(video_path)
+    outputs = []
+    current = 0  # 다음에 읽을 프레임 번호
+    try:
+        for position in _frame_positions(cap, times, every):
+            step = position - current
+            if step >= SEEK_MIN_STEP or step < 0:
+                # 멀리 떨어진 프레임은 바로 이동
+                cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+            else:
+                # 가까운 프레임은 grab()으로 건너뜀 (BGR 변환을 하지 않아 read()보다 빠름)
+                for _ in range(step):
+                    cap.grab()
+            ret, frame = cap.read()
+            if not ret:
+                break
+            current = position + 1
+            # 같은 초에 여러 장을 저장하므로 프레임 번호를 붙임
+            filename = _output_name(video_path, output_dir, f'_f{position:06d}.jpg')
+            if cv2.imwrite(filename, frame):
+                outputs.append(filename)
+    finally:
+        cap.release()
+    return len(outputs), outputs
+
+
+def detect_events(video_path, output_dir, fourcc=DEFAULT_FOURCC, preroll_seconds=1.0, stop_after=2.0):
+    """움직임/장면 전환을 찾아서 장면 전환 JPG와 움직임 구간 클립을 저장하는 함수
+
+    반환: (처리한 프레임 수, 출력 파일 목록)
+    """
+    cap = _open(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    detector = MotionDetector()
+    trigger = AutoTrigger(fps, stop_after=stop_after)
+    preroll = None
+    preroll_drained = None  # 쓰기 스레드가 직전 장면 버퍼를 다 쓰면 set 되는 Event
+    recording = False
+    outputs = []
+    frames = 0
+
+    reader = FrameReader(cap).start()
+    writer = FrameWriter(block=True)
+    try:
+        while True:
+            item = reader.read()
+            if item is None:
+                break
+            index, frame = item
+            frames += 1
+            if recording:
+                writer.write(frame)
+            if preroll_seconds > 0:
+                if preroll is None:
+                    preroll = FrameRingBuffer.for_duration(preroll_seconds, fps, frame.shape, frame.dtype)
+                if preroll_drained is not None and not recording:
+                    # 녹화가 끝나면 직전 장면을 다 쓸 때까지 기다린 뒤 녹화 전 프레임은 버리고 새로 모음
+                    preroll_drained.wait()
+                    preroll.clear()
+                    preroll_drained = None
+                if not recording:
+                    preroll.append(frame)
+
+            for action in trigger.update(index, *detector.update(frame)):
+                if action == 'snapshot':
+                    filename = _output_name(video_path, output_dir, f'_scene{index:06d}.jpg')
+                    writer.save_image(filename, frame)
+                    outputs.append(filename)
+                elif action == 'start':
+                    filename = _output_name(video_path, output_dir, f'_clip{index:06d}.mp4')
+                    writer.start_recording(filename, cv2.VideoWriter_fourcc(*fourcc), fps,
+                                           (frame.shape[1], frame.shape[0]), wait=True)
+                    if preroll is not None and len(preroll):
+                        # 복사하지 않고 버퍼 메모리를 그대로 넘김 (녹화 중에는 버퍼에 추가하지 않음)
+                        preroll_drained = writer.write_many(preroll.ordered_views())
+                    recording = True
+                    outputs.append(filename)
+                elif action == 'stop':
+                    writer.stop_recording()
+                    recording = False
+    finally:
+        reader.stop()
+        writer.close()
+        cap.release()
+    return frames, outputs
+
+
+def process_file(video_path, mode, output_dir, options):
+    """파일 하나를 처리하는 함수 (프로세스 풀에서 실행)"""
+    start = time.perf_counter()
+    if mode == 'transcode':
+        frames, outputs = transcode(video_path, output_dir, **options)
+    elif mode == 'detect':
+        frames, outputs = detect_events(video_path, output_dir, **options)
+    else:
+        frames, outputs = extract_frames(video_path, output_dir, **options)
+    return {'file': video_path, 'frames': frames, 'outputs': outputs, 'seconds': time.perf_counter() - start}
+
+
+def run_batch(files, mode, output_dir, options, workers=None):
+    """파일 목록을 프로세스 풀에서 처리하고 파일별 결과를 출력하는 함수"""
+    os.makedirs(output_dir, exist_ok=True)
+    batch_start = time.perf_counter()
+    results = []
+    failures = 0
+
+    print(f'=== {mode}: {len(files)}개 파일 처리 (프로세스 {workers or os.cpu_count()}개) ===')
+    with process_pool(workers) as executor:
+        futures = {executor.submit(process_file, path, mode, output_dir, options): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except (OSError, cv2.error) as error:
+                failures += 1
+                print(f'- {path}: 실패 ({error})')
+                continue
+            results.append(result)
+            speed = result['frames'] / result['seconds'] if result['seconds'] else 0
+            print(f"- {path}: {result['frames']}프레임, 파일 {len(result['outputs'])}개, "
+                  f"{result['seconds']:.2f}초 ({speed:,.0f} 프레임/초)")
+
+    elapsed = time.perf_counter() - batch_start
+    total_frames = sum(result['frames'] for result in results)
+    print(f'성공 {len(results)}개, 실패 {failures}개, 총 {total_frames:,}프레임, {elapsed:.2f}초 '
+          f'({total_frames / elapsed:,.0f} 프레임/초)')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='여러 동영상 파일 일괄 처리 (화면 없음)')
+    parser.add_argument('mode', choices=['transcode', 'extract', 'detect'], help='작업 종류')
+    parser.add_argument('inputs', nargs='+', help='동영상 파일 경로 또는 glob 패턴')
+    parser.add_argument('--output', default='video_output', help='결과를 저장할 폴더')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: CPU 코어 수)')
+    parser.add_argument('--fourcc', default=DEFAULT_FOURCC, help='transcode, detect: 코덱 (예: mp4v, avc1)')
+    parser.add_argument('--width', type=int, help='transcode: 출력 너비 (비율 유지)')
+    parser.add_argument('--times', type=float, nargs='+', help='extract: 저장할 시각(초)')
+    parser.add_argument('--every', type=int, help='extract: N 프레임마다 저장')
+    parser.add_argument('--preroll', type=float, default=1.0, help='detect: 클립 앞에 붙일 직전 장면 길이(초)')
+    parser.add_argument('--stop-after', type=float, default=2.0, help='detect: 움직임이 없으면 클립을 끝낼 시간(초)')
+    args = parser.parse_args()
+
+    if args.mode == 'transcode':
+        options = {'fourcc': args.fourcc, 'width': args.width}
+    elif args.mode == 'detect':
+        options = {'fourcc': args.fourcc, 'preroll_seconds': args.preroll, 'stop_after': args.stop_after}
+    else:
+        if not args.times and not args.every:
+            parser.error('extract에는 --times 또는 --every가 필요합니다')
+        if args.every is not None and args.every <= 0:
+            parser.error('--every는 1 이상이어야 합니다')
+        options = {'times': args.times, 'every': args.every}
+
+    files = find_files(args.inputs)
+    if not files:
+        print(f'동영상 파일을 찾을 수 없습니다: {args.inputs}')
+        return
+    run_batch(files, args.mode, args.output, options, workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
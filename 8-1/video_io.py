@@ -0,0 +1,184 @@
+"""동영상 프레임 읽기와 쓰기를 재생 루프와 분리하는 도구
+
+디코딩(cap.read)은 별도 스레드에서 미리 해 두고, 인코딩(VideoWriter.write, imwrite)은
+별도 스레드에 맡겨서 재생 루프는 큐에서 프레임을 꺼내 표시만 한다.
+OpenCV는 디코딩/인코딩 중에 GIL을 놓기 때문에 스레드만으로도 이 시간이 화면 표시와 겹쳐진다.
+"""
+import queue
+import threading
+import time
+
+import cv2
+
+
+class FrameReader:
+    """별도 스레드에서 프레임을 미리 디코딩해서 크기가 제한된 큐에 채워 두는 읽기 도구
+
+    cap: 열려 있는 cv2.VideoCapture (시작한 뒤에는 다른 스레드에서 사용하지 않아야 함)
+    queue_size: 미리 읽어 둘 최대 프레임 수 (메모리 사용량 = 프레임 크기 × queue_size)
+    stats: 디코딩 시간을 기록할 PlaybackStats (None이면 기록하지 않음)
+    """
+
+    def __init__(self, cap, queue_size=16, stats=None):
+        self.cap = cap
+        self.stats = stats
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _put(self, item):
+        # 큐가 가득 차면 재생 쪽에서 꺼낼 때까지 기다림 (중지 요청은 주기적으로 확인)
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _run(self):
+        index = 0
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if self.stats is not None:
+                self.stats.add('decode', time.perf_counter() - start)
+            if not ret:
+                break
+            self._put((index, frame))
+            index += 1
+        # 끝 표시
+        self._put(None)
+
+    def read(self):
+        """다음 (프레임 번호, 프레임)을 반환 (동영상이 끝나면 None)"""
+        return self.queue.get()
+
+    def stop(self):
+        """디코딩 스레드를 멈추고 끝날 때까지 기다림"""
+        self._stop.set()
+        self._thread.join()
+
+
+class FrameWriter:
+    """동영상 녹화와 이미지 저장(인코딩)을 별도 스레드에서 처리하는 쓰기 도구
+
+    작업은 요청한 순서대로 하나의 스레드에서 처리한다.
+    queue_size: 쓰기를 기다릴 수 있는 최대 작업 수
+    block: True이면 큐가 가득 찼을 때 녹화 프레임도 자리가 날 때까지 기다리고(backpressure),
+           False이면 기다리지 않고 버린 프레임 수만 셈 (재생이 멈추지 않음)
+    stats: 인코딩 시간을 기록할 PlaybackStats (None이면 기록하지 않음)
+    """
+
+    def __init__(self, queue_size=64, block=False, stats=None):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.block = block
+        self.stats = stats
+        self.dropped_frames = 0
+        self.open_error = None  # 마지막으로 파일을 열지 못한 이유 (열었으면 None)
+        self._writer = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            task = self.queue.get()
+            if task is None:
+                break
+            kind, *args = task
+            if kind == 'open':
+                *writer_args, opened = args
+                self._release()
+                self._writer = cv2.VideoWriter(*writer_args)
+                self.open_error = None
+                if not self._writer.isOpened():
+                    self.open_error = f'동영상 파일을 만들 수 없습니다: {writer_args[0]}'
+                    print(self.open_error)
+                    self._writer = None
+                if opened is not None:
+                    opened.set()
+            elif kind == 'frame':
+                self._write(args[0])
+            elif kind == 'frames':
+                blocks, done = args
+                for block in blocks:
+                    for frame in block:
+                        self._write(frame)
+                done.set()
+            elif kind == 'image':
+                start = time.perf_counter()
+                saved = cv2.imwrite(*args)
+                self._record('imwrite', start)
+                if not saved:
+                    print(f'이미지를 저장할 수 없습니다: {args[0]}')
+            elif kind == 'release':
+                self._release()
+        self._release()
+
+    def _record(self, stage, start):
+        if self.stats is not None:
+            self.stats.add(stage, time.perf_counter() - start)
+
+    def _write(self, frame):
+        if self._writer is not None:
+            start = time.perf_counter()
+            self._writer.write(frame)
+            self._record('write', start)
+
+    def _release(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+    def start_recording(self, filename, fourcc, fps, frame_size, wait=False):
+        """새 동영상 파일 녹화를 시작 (녹화 중인 파일이 있으면 먼저 닫음)
+
+        wait: True이면 쓰기 스레드가 파일을 열 때까지 기다리고, 열지 못하면 OSError
+              (False이면 기다리지 않고, 실패하면 메시지만 출력하고 프레임은 버림)
+        """
+        opened = threading.Event() if wait else None
+        self.queue.put(('open', filename, fourcc, fps, frame_size, opened))
+        if opened is not None:
+            opened.wait()
+            if self.open_error is not None:
+                raise OSError(self.open_error)
+
+    def write(self, frame):
+        """녹화 중인 동영상에 프레임을 추가
+
+        frame은 큐에서 기다리는 동안 바뀌면 안 되므로 재사용하는 버퍼라면 복사해서 넘겨야 함
+        """
+        if self.block:
+            self.queue.put(('frame', frame))
+            return
+        try:
+            self.queue.put_nowait(('frame', frame))
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def write_many(self, blocks):
+        """여러 프레임을 한 작업으로 추가하고, 모두 쓰고 나면 set 되는 threading.Event를 반환
+
+        blocks: 프레임 배열 목록 (예: FrameRingBuffer.ordered_views()의 뷰)
+        복사하지 않고 그대로 쓰므로 Event가 set 될 때까지 blocks의 내용을 바꾸면 안 됨
+        pre-roll처럼 버리면 안 되므로 큐에 자리가 날 때까지 기다림
+        """
+        done = threading.Event()
+        self.queue.put(('frames', blocks, done))
+        return done
+
+    def stop_recording(self):
+        """녹화 중인 동영상 파일을 닫음"""
+        self.queue.put(('release',))
+
+    def save_image(self, filename, image):
+        """이미지 저장 (캡처는 버리지 않도록 자리가 날 때까지 기다림)"""
+        self.queue.put(('image', filename, image))
+
+    def close(self):
+        """남은 작업을 모두 처리하고 스레드를 끝냄"""
+        self.queue.put(None)
+        self._thread.join()
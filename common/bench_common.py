@@ -0,0 +1,117 @@
+'''4-1/bench.py, 4-2/bench.py가 함께 쓰는 합성 데이터 벤치마크 뼈대
+
+각 bench.py는 합성 데이터를 만들고 단계를 측정하는 run_stages(rows, trace_memory)만 정의하고,
+명령줄 처리, 결과 JSON 저장, 이전 결과와의 비교는 run_benchmark()에 맡긴다.
+'''
+import argparse
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+RESULT_DIR = 'bench_results'
+DEFAULT_SIZES = ['10k', '1m', '10m']
+
+
+def parse_size(text):
+    ''''10k', '1m', '10m' 같은 문자열을 행 수로 바꾼다.'''
+    text = text.lower()
+    units = {'k': 1_000, 'm': 1_000_000}
+    if text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def measure(results, rows, stage, func, *args, trace_memory=True, **kwargs):
+    '''함수 하나를 실행하면서 실행 시간과 최대 메모리를 재고 results에 추가한다.
+
+    반환: func의 반환값
+    '''
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    # 단계별 print 출력은 버림
+    with contextlib.redirect_stdout(io.StringIO()):
+        value = func(*args, **kwargs)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+
+    results.append({'rows': rows, 'stage': stage, 'wall_s': round(wall, 6),
+                    'cpu_s': round(cpu, 6), 'peak_mb': None if peak is None else round(peak, 3)})
+    memory_text = '' if peak is None else f', 최대 메모리 {peak:,.1f}MB'
+    print(f'  {stage:<28} {wall:8.3f}s (CPU {cpu:.3f}s{memory_text})')
+    return value
+
+
+def compare(results, previous_path):
+    '''이전 결과 파일과 단계별 실행 시간을 비교해서 출력한다.'''
+    with open(previous_path, encoding='utf-8') as f:
+        previous = {(r['rows'], r['stage']): r for r in json.load(f)['results']}
+    print(f'\n[비교] {previous_path} 대비 (비율 > 1이면 느려짐)')
+    for result in results:
+        old = previous.get((result['rows'], result['stage']))
+        if old is None or not old['wall_s']:
+            continue
+        ratio = result['wall_s'] / old['wall_s']
+        print(f"  {result['rows']:>10,} {result['stage']:<28} "
+              f"{old['wall_s']:8.3f}s → {result['wall_s']:8.3f}s (x{ratio:.2f})")
+
+
+def run_benchmark(script, run_stages):
+    '''명령줄 옵션을 읽고 크기별로 run_stages()를 실행한 뒤 결과를 저장/비교한다.
+
+    script: 결과 파일 이름과 보고서에 쓸 스크립트 이름 (예: 't_main')
+    run_stages: (rows, trace_memory)를 받아 측정 결과 목록을 반환하는 함수
+    '''
+    parser = argparse.ArgumentParser(description=f'{script}.py 합성 데이터 벤치마크')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help='측정할 전체 행 수 (예: 10k 1m 10m)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='tracemalloc 메모리 측정을 끔 (측정 자체의 부하 제거)')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON 파일')
+    args = parser.parse_args()
+
+    # 원본 코드의 SettingWithCopyWarning 등 경고와 한글 폰트 경고는 출력하지 않음
+    warnings.filterwarnings('ignore')
+    logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_stages(parse_size(size), trace_memory=not args.no_memory))
+
+    report = {
+        'script': script,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'trace_memory': not args.no_memory,
+        'results': results,
+    }
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    result_path = os.path.join(RESULT_DIR, f"{script}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'\n결과를 {result_path} 파일로 저장했습니다.')
+
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,303 @@
+'''파싱한 CSV 데이터를 Feather(Arrow) 이진 컬럼 형식으로 저장해 두는 캐시
+
+같은 파일을 다시 읽을 때 텍스트를 파싱하지 않고 캐시 파일을 메모리 매핑으로 불러온다.
+캐시는 파일 경로, 크기, 수정 시각, 내용 해시와 읽기 옵션이 모두 같을 때만 사용하고,
+전체 크기가 MAX_CACHE_BYTES를 넘으면 가장 오래 사용하지 않은 항목부터 지운다.
+pyarrow가 설치되어 있지 않으면 캐시 없이 그대로 읽는다.
+여러 프로세스가 동시에 사용해도 되도록 index.json은 잠금 파일을 잡은 상태에서만 고친다.
+
+명령줄 사용법 (캐시 폴더는 현재 폴더 기준이므로 4-1, 4-2 폴더에서 실행):
+    python ../common/csv_cache.py list                 # 캐시 목록 출력
+    python ../common/csv_cache.py invalidate [파일 ...]  # 지정한 파일(없으면 전체)의 캐시 삭제
+'''
+import argparse
+import contextlib
+import glob
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+CACHE_DIR = '.csv_cache'
+MAX_CACHE_BYTES = 1024 ** 3  # 1GB
+INDEX_NAME = 'index.json'
+LOCK_NAME = 'index.lock'
+
+
+def _empty_index():
+    # files: 파일별 지문, entries: 캐시된 데이터, outputs: 최신 상태를 기록한 출력 파일
+    return {'files': {}, 'entries': {}, 'outputs': {}}
+
+
+def _load_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, INDEX_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return _empty_index()
+
+
+def _save_index(cache_dir, index):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, INDEX_NAME)
+    # 임시 파일에 쓰고 교체해서 여러 프로세스가 동시에 써도 파일이 깨지지 않게 함
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _lock(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return
+    # msvcrt.locking()은 약 10초 동안 잠그지 못하면 OSError를 내므로 잡을 때까지 반복
+    while True:
+        try:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def _unlock(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    else:
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def _locked_index(cache_dir):
+    '''잠금을 잡고 index를 읽어서 넘기고, 블록이 끝나면 저장한 뒤 잠금을 푼다.
+
+    다른 프로세스가 읽은 뒤 저장하기 전에 끼어들어 서로의 항목을 덮어쓰지 않도록 하기 위함
+    '''
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, LOCK_NAME), 'a+b') as lock_file:
+        _lock(lock_file)
+        try:
+            index = _load_index(cache_dir)
+            yield index
+            _save_index(cache_dir, index)
+        finally:
+            _unlock(lock_file)
+
+
+def content_hash(path, block_size=1 << 20):
+    '''파일 내용의 해시(blake2b)를 계산한다.'''
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fingerprint(index, path):
+    '''파일 내용 해시를 반환한다.
+
+    크기와 수정 시각이 기록과 같으면 이전에 계산한 해시를 그대로 사용
+    '''
+    abs_path = os.path.abspath(path)
+    stat = os.stat(path)
+    known = index['files'].get(abs_path)
+    if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+        return known['hash']
+    file_hash = content_hash(path)
+    index['files'][abs_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': file_hash}
+    return file_hash
+
+
+def _entry_key(path, tag, options):
+    text = json.dumps([os.path.abspath(path), tag, options], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def _remove_entry(cache_dir, index, key):
+    entry = index['entries'].pop(key)
+    try:
+        os.remove(os.path.join(cache_dir, entry['file']))
+    except FileNotFoundError:
+        pass
+
+
+def _remove_orphans(cache_dir, index):
+    '''index에 없는 캐시 파일을 삭제하고 삭제한 수를 반환한다. (동시에 저장하다 기록이 사라진 파일 등)'''
+    known = {entry['file'] for entry in index['entries'].values()}
+    removed = 0
+    for data_path in glob.glob(os.path.join(cache_dir, '*.feather')):
+        if os.path.basename(data_path) not in known:
+            try:
+                os.remove(data_path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def _evict(cache_dir, index, max_bytes):
+    '''전체 크기가 max_bytes 이하가 될 때까지 오래 사용하지 않은 항목부터 삭제한다. (LRU)'''
+    _remove_orphans(cache_dir, index)
+    total = sum(entry['bytes'] for entry in index['entries'].values())
+    for key in sorted(index['entries'], key=lambda k: index['entries'][k]['last_used']):
+        if total <= max_bytes:
+            break
+        total -= index['entries'][key]['bytes']
+        _remove_entry(cache_dir, index, key)
+
+
+def load_cached(path, loader, tag='read_csv', options=None, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    '''loader(path)로 읽은 데이터프레임을 캐시하고, 파일이 그대로면 캐시에서 불러온다.
+
+    path: 원본 CSV 파일 경로
+    loader: 파일 경로를 받아 데이터프레임을 반환하는 함수
+    tag, options: 읽는 방식을 구분하는 이름과 옵션 (달라지면 다른 캐시 사용)
+    '''
+    try:
+        import pyarrow
+        import pyarrow.feather as feather
+    except ImportError:
+        return loader(path)
+
+    abs_path = os.path.abspath(path)
+    key = _entry_key(path, tag, options)
+    data_path = os.path.join(cache_dir, f'{key}.feather')
+    # 내용 해시 계산은 오래 걸릴 수 있으므로 잠그지 않고 읽은 index로 계산
+    snapshot = _load_index(cache_dir)
+    file_hash = _fingerprint(snapshot, path)
+
+    with _locked_index(cache_dir) as index:
+        index['files'][abs_path] = snapshot['files'][abs_path]
+        entry = index['entries'].get(key)
+        hit = entry is not None and entry['hash'] == file_hash and os.path.exists(data_path)
+        if hit:
+            entry['last_used'] = time.time()
+
+    if hit:
+        try:
+            # memory_map=True는 파일 전체를 복사하지 않고 메모리에 매핑해서 읽음
+            return feather.read_table(data_path, memory_map=True).to_pandas()
+        except (OSError, pyarrow.ArrowException):
+            # 그 사이 다른 프로세스가 지웠으면 다시 파싱
+            pass
+
+    df = loader(path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f'{data_path}.{os.getpid()}.tmp'
+    try:
+        feather.write_feather(df, tmp_path, compression='uncompressed')
+    except (ValueError, TypeError, pyarrow.ArrowException):
+        # 여러 타입이 섞인 열 등 Arrow로 저장할 수 없는 데이터는 캐시하지 않음
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return df
+
+    with _locked_index(cache_dir) as index:
+        # 파일 교체와 기록을 같은 잠금 안에서 해야 다른 프로세스가 기록 없는 파일로 보고 지우지 않음
+        os.replace(tmp_path, data_path)
+        index['entries'][key] = {
+            'path': abs_path,
+            'tag': tag,
+            'hash': file_hash,
+            'file': os.path.basename(data_path),
+            'bytes': os.path.getsize(data_path),
+            'last_used': time.time(),
+        }
+        _evict(cache_dir, index, max_bytes)
+    return df
+
+
+def read_csv_cached(path, cache_dir=CACHE_DIR, **kwargs):
+    '''pd.read_csv()와 같지만 파싱 결과를 캐시에서 재사용한다.'''
+    # 청크 단위로 읽는 경우는 캐시하지 않음
+    if kwargs.get('chunksize') or kwargs.get('iterator'):
+        return pd.read_csv(path, **kwargs)
+    return load_cached(path, lambda p: pd.read_csv(p, **kwargs), tag='read_csv',
+                       options=kwargs, cache_dir=cache_dir)
+
+
+def output_is_fresh(output_path, input_paths, cache_dir=CACHE_DIR):
+    '''output_path가 지금의 입력 파일들로 만든 결과 그대로인지 확인한다.'''
+    with _locked_index(cache_dir) as index:
+        record = index['outputs'].get(os.path.abspath(output_path))
+        if record is None or not os.path.exists(output_path):
+            return False
+        stat = os.stat(output_path)
+        if stat.st_size != record['size'] or stat.st_mtime_ns != record['mtime_ns']:
+            return False
+        current = {os.path.abspath(p): _fingerprint(index, p) for p in input_paths}
+    return current == record['inputs']
+
+
+def record_output(output_path, input_paths, cache_dir=CACHE_DIR):
+    '''output_path를 지금의 입력 파일들로 만들었다고 기록한다.'''
+    with _locked_index(cache_dir) as index:
+        stat = os.stat(output_path)
+        index['outputs'][os.path.abspath(output_path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'inputs': {os.path.abspath(p): _fingerprint(index, p) for p in input_paths},
+        }
+
+
+def invalidate(paths=None, cache_dir=CACHE_DIR):
+    '''지정한 파일들(없으면 전체)의 캐시와 출력 기록을 삭제한다.
+
+    반환: 삭제한 캐시 항목 수 (기록 없이 남아 있던 캐시 파일 포함)
+    '''
+    targets = None if not paths else {os.path.abspath(p) for p in paths}
+    removed = 0
+    with _locked_index(cache_dir) as index:
+        for key in list(index['entries']):
+            if targets is None or index['entries'][key]['path'] in targets:
+                _remove_entry(cache_dir, index, key)
+                removed += 1
+        if targets is None:
+            index.update(_empty_index())
+        else:
+            for abs_path in targets:
+                index['files'].pop(abs_path, None)
+            # 입력이나 출력으로 관련된 출력 기록도 삭제
+            index['outputs'] = {
+                out: record for out, record in index['outputs'].items()
+                if out not in targets and not targets & set(record['inputs'])
+            }
+        # 어느 파일의 캐시인지 알 수 없는 기록 없는 파일도 함께 삭제
+        removed += _remove_orphans(cache_dir, index)
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CSV 파싱 캐시 관리')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='캐시 폴더')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help='캐시 목록 출력')
+    invalidate_parser = subparsers.add_parser('invalidate', help='캐시 삭제')
+    invalidate_parser.add_argument('paths', nargs='*', help='캐시를 지울 CSV 파일 (없으면 전체)')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        index = _load_index(args.cache_dir)
+        total = 0
+        for entry in sorted(index['entries'].values(), key=lambda e: e['last_used'], reverse=True):
+            total += entry['bytes']
+            used = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['last_used']))
+            print(f"- {entry['path']} [{entry['tag']}] {entry['bytes']:,} bytes (마지막 사용: {used})")
+        print(f'총 {len(index["entries"])}개, {total:,} bytes')
+    else:
+        removed = invalidate(args.paths, args.cache_dir)
+        print(f'캐시 {removed}개를 삭제했습니다.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+'''그래프를 필요할 때만, 바뀌었을 때만 그리는 도구
+
+- matplotlib은 그래프를 실제로 그릴 때 처음 import (그래프가 필요 없는 실행은 시작이 빨라짐)
+- headless 모드: 화면 없는 Agg 백엔드를 쓰는 별도 프로세스가 그래프를 파일로 저장하고,
+  그동안 메인 프로세스는 다음 단계를 계속 실행
+- headless 모드에서는 그래프에 들어가는 값과 그리는 코드가 지난번과 같고
+  이미지 파일이 남아 있으면 다시 그리지 않음
+
+사용 예:
+    with FigureRenderer('headless') as renderer:
+        renderer.render(plot_age_transported, 'age_transported.png', age_counts)
+'''
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+
+RENDER_INDEX = '.render_index.json'
+PLOT_MODES = ('show', 'headless', 'none')
+
+
+def load_pyplot():
+    '''matplotlib.pyplot을 처음 필요할 때 import해서 반환한다.'''
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _use_agg():
+    # 작업 프로세스는 pyplot을 import하기 전에 화면 없는 백엔드로 설정
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _update_code(digest, code):
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        # 함수 안의 lambda 등은 repr에 메모리 주소가 들어가므로 코드 내용으로 해시
+        if isinstance(const, type(code)):
+            _update_code(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+
+def data_fingerprint(func, *values):
+    '''그리는 함수의 코드와 그래프에 들어가는 값으로 지문(해시)을 만든다.'''
+    digest = hashlib.blake2b(digest_size=16)
+    _update_code(digest, func.__code__)
+    for value in values:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            # 값과 인덱스는 해시로, 열 이름은 문자열로
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+            columns = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+            digest.update(repr(list(columns)).encode())
+        else:
+            digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+def _load_index():
+    try:
+        with open(RENDER_INDEX, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index):
+    temp = f'{RENDER_INDEX}.{os.getpid()}.tmp'
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(temp, RENDER_INDEX)
+
+
+class FigureRenderer:
+    '''그래프 그리기 방식을 정하는 도구
+
+    mode: 'show'는 기존처럼 그려서 저장하고 화면에 표시,
+          'headless'는 별도 프로세스(Agg 백엔드)에서 파일로만 저장하고 값이 같으면 건너뜀,
+          'none'은 그래프를 그리지 않음
+    그리는 함수는 func(*args, path=..., show=...) 형태여야 함
+    '''
+
+    def __init__(self, mode='show'):
+        if mode not in PLOT_MODES:
+            raise ValueError(f'지원하지 않는 그래프 모드입니다: {mode}')
+        self.mode = mode
+        self._executor = None
+        self._pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def render(self, func, path, *args):
+        '''그래프 하나를 그린다. (headless 모드에서는 작업을 넘기고 바로 반환)'''
+        if self.mode == 'none':
+            return
+        if self.mode == 'show':
+            func(*args, path=path)
+            return
+
+        fingerprint = data_fingerprint(func, *args)
+        if os.path.exists(path) and _load_index().get(os.path.abspath(path)) == fingerprint:
+            print(f'\n{path} 그래프의 값이 바뀌지 않아서 다시 그리지 않습니다.')
+            return
+        if self._executor is None:
+            # 그래프가 처음 필요할 때 작업 프로세스를 만듦
+            self._executor = ProcessPoolExecutor(max_workers=1, initializer=_use_agg)
+        future = self._executor.submit(func, *args, path=path, show=False)
+        self._pending.append((path, fingerprint, future))
+
+    def close(self):
+        '''남은 그래프 작업이 끝날 때까지 기다리고, 저장한 그래프의 지문을 기록한다.'''
+        if self._executor is None:
+            return
+        index = _load_index()
+        try:
+            for path, fingerprint, future in self._pending:
+                future.result()
+                index[os.path.abspath(path)] = fingerprint
+                print(f'\n그래프를 {path} 파일로 저장했습니다.')
+        finally:
+            # 실패한 그래프가 있어도 먼저 저장된 그래프의 지문은 기록
+            self._pending = []
+            self._executor.shutdown()
+            self._executor = None
+            _save_index(index)
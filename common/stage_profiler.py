@@ -0,0 +1,172 @@
+'''main()의 단계별 실행 시간, 메모리, 행 수를 재는 도구 (필요할 때만 켜서 사용)
+
+사용 예:
+    with StageProfiler(report_path='profile.json') as profiler:
+        with profiler.stage('load') as stage:
+            df = pd.read_csv(path)
+            stage.rows_out(df)
+
+- wall/CPU 시간: time.perf_counter(), time.process_time()
+- 메모리: 단계 안에서 파이썬이 할당한 최대 메모리(tracemalloc)와 프로세스 최대 RSS
+  (프로세스 풀의 작업 프로세스에서 쓴 CPU 시간과 메모리는 포함되지 않음)
+- cprofile_dir를 주면 단계마다 cProfile 결과(.prof)를 저장 (snakeviz, pstats로 확인)
+'''
+import contextlib
+import cProfile
+import json
+import numbers
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource  # Windows에는 없음
+except ImportError:
+    resource = None
+
+
+def count_rows(value):
+    '''행 수를 반환한다. (DataFrame/Series는 len, 큐브처럼 present 배열이 있으면 원본에 있던 조합 수)'''
+    if value is None:
+        return None
+    if isinstance(value, numbers.Integral):
+        return value
+    present = getattr(value, 'present', None)
+    if present is not None:
+        return int(present.sum())
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss 단위는 Linux는 KB, macOS는 바이트
+    return rss / 1024 ** 2 if sys.platform == 'darwin' else rss / 1024
+
+
+class StageRecord:
+    '''단계 하나의 측정 결과'''
+
+    def __init__(self, name):
+        self.name = name
+        self.values = {'stage': name, 'rows_in': None, 'rows_out': None}
+
+    def _rows(self, values):
+        counts = [count_rows(value) for value in values]
+        return None if any(count is None for count in counts) else sum(counts)
+
+    def rows_in(self, *values):
+        '''단계에 들어간 행 수를 기록한다. (여러 개를 주면 합계)'''
+        self.values['rows_in'] = self._rows(values)
+
+    def rows_out(self, *values):
+        '''단계에서 나온 행 수를 기록한다. (여러 개를 주면 합계)'''
+        self.values['rows_out'] = self._rows(values)
+
+
+class StageProfiler:
+    '''단계별 측정 결과를 모으고 요약을 출력/저장한다.
+
+    enabled: False이면 측정하지 않음 (stage()는 그대로 쓸 수 있음)
+    trace_memory: tracemalloc으로 단계별 최대 메모리를 잼 (측정 부하가 있음)
+    cprofile_dir: 단계별 cProfile 결과를 저장할 폴더
+    report_path: 끝날 때 요약을 저장할 JSON 파일
+    '''
+
+    def __init__(self, enabled=True, trace_memory=True, cprofile_dir=None, report_path=None):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.cprofile_dir = cprofile_dir
+        self.report_path = report_path
+        self.stages = []
+        self._started_tracing = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        record = StageRecord(name)
+        if not self.enabled:
+            yield record
+            return
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        profile = None
+        if self.cprofile_dir:
+            profile = cProfile.Profile()
+            profile.enable()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            if profile is not None:
+                profile.disable()
+                os.makedirs(self.cprofile_dir, exist_ok=True)
+                path = os.path.join(self.cprofile_dir, f'{len(self.stages) + 1:02d}_{name}.prof')
+                profile.dump_stats(path)
+                record.values['cprofile'] = path
+            peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2 if self.trace_memory else None
+            rss = _max_rss_mb()
+            record.values.update({
+                'wall_s': round(wall, 6),
+                'cpu_s': round(cpu, 6),
+                'peak_mb': None if peak is None else round(peak, 3),
+                'max_rss_mb': None if rss is None else round(rss, 3),
+            })
+            self.stages.append(record.values)
+
+    def print_report(self):
+        print('\n=== 단계별 실행 시간과 메모리 ===')
+        print(f"{'단계':<18}{'wall(s)':>9}{'CPU(s)':>9}{'최대 메모리(MB)':>14}{'RSS(MB)':>10}"
+              f"{'입력 행':>12}{'출력 행':>12}")
+
+        def text(value, fmt):
+            return '-' if value is None else format(value, fmt)
+
+        for row in self.stages:
+            print(f"{row['stage']:<18}{row['wall_s']:>9.3f}{row['cpu_s']:>9.3f}"
+                  f"{text(row['peak_mb'], ',.1f'):>14}{text(row['max_rss_mb'], ',.1f'):>10}"
+                  f"{text(row['rows_in'], ','):>12}{text(row['rows_out'], ','):>12}")
+
+    def save(self, path):
+        report = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'script': os.path.basename(sys.argv[0]),
+            'python': platform.python_version(),
+            'machine': platform.platform(),
+            'trace_memory': self.trace_memory,
+            'stages': self.stages,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    def close(self):
+        '''측정을 끝내고 요약을 출력한다. (report_path가 있으면 저장)'''
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        if not self.enabled or not self.stages:
+            return
+        self.print_report()
+        if self.report_path:
+            self.save(self.report_path)
+            print(f'\n단계별 측정 결과를 {self.report_path} 파일로 저장했습니다.')